@@ -664,6 +664,7 @@ async function getTrainingData(req, res) {
     const { allAsync, runAsync } = require('../utils/dbHelper');
 
     const sinceIdParam = req.query.since_id;
+    const maxIdParam = req.query.max_id;
     const lookbackParam = req.query.lookback_days;
     let sinceId = 0;
     if (sinceIdParam !== undefined) {
@@ -672,6 +673,14 @@ async function getTrainingData(req, res) {
         sinceId = parsed;
       }
     }
+    // Keyset-Paging: max_id begrenzt die Seite nach oben (inklusive)
+    let pageMaxId = 0;
+    if (maxIdParam !== undefined) {
+      const parsed = parseInt(maxIdParam, 10);
+      if (Number.isFinite(parsed) && parsed > 0) {
+        pageMaxId = parsed;
+      }
+    }
     let lookbackDays = 0;
     if (lookbackParam !== undefined) {
       const parsed = parseInt(lookbackParam, 10);
@@ -706,7 +715,13 @@ async function getTrainingData(req, res) {
       deltaParams.push(`-${lookbackDays} day`);
     }
     const deltaClause = deltaConditions.length ? `AND (${deltaConditions.join(' OR ')})` : '';
-    const orderByClause = deltaConditions.length
+    const pageClause = pageMaxId > 0 ? 'AND t.id <= ?' : '';
+    const pageParams = pageMaxId > 0 ? [pageMaxId] : [];
+    // Sobald der Aufrufer seitenweise liest (limit, max_id, Delta), muss die
+    // Reihenfolge zum id-Cursor passen, sonst gehen Termine zwischen Seiten verloren.
+    // Nur die Übersicht ohne Parameter bleibt nach Dauer sortiert.
+    const paging = limitParam !== undefined || pageMaxId > 0 || deltaConditions.length > 0;
+    const orderByClause = paging
       ? 'ORDER BY t.id DESC'
       : 'ORDER BY t.tatsaechliche_zeit DESC';
 
@@ -729,9 +744,10 @@ async function getTrainingData(req, res) {
         AND t.tatsaechliche_zeit IS NOT NULL
         AND t.tatsaechliche_zeit > 0
       ${deltaClause}
+      ${pageClause}
       ${orderByClause}
       ${limitClause}
-    `, [...deltaParams, ...limitParams]);
+    `, [...deltaParams, ...pageParams, ...limitParams]);
 
     // Statistiken berechnen
     const stats = await allAsync(`
@@ -790,6 +806,7 @@ async function getTrainingData(req, res) {
         meta: {
           max_id: maxId,
           since_id: sinceId || null,
+          page_max_id: pageMaxId || null,
           lookback_days: lookbackDays || null
         }
       }
@@ -801,6 +818,76 @@ async function getTrainingData(req, res) {
   }
 }
 
+/**
+ * GET /api/ai/training-data/watermark
+ * Liefert einen günstigen Änderungsstand der Trainingsdaten (ohne Termine).
+ * Der externe KI-Service prüft damit, ob sich ein Training überhaupt lohnt.
+ * Unterstützt If-None-Match (304 bei unverändertem Stand).
+ * Mit lookback_days beziehen sich Zähler und Prüfsummen auf dasselbe Fenster,
+ * das der KI-Service abruft; Änderungen außerhalb könnte er nicht übernehmen.
+ */
+async function getTrainingDataWatermark(req, res) {
+  try {
+    const { allAsync } = require('../utils/dbHelper');
+
+    let lookbackDays = 0;
+    if (req.query.lookback_days !== undefined) {
+      const parsed = parseInt(req.query.lookback_days, 10);
+      if (Number.isFinite(parsed) && parsed > 0) {
+        lookbackDays = parsed;
+      }
+    }
+    const baseFilter = `geloescht_am IS NULL
+        AND arbeit IS NOT NULL
+        AND tatsaechliche_zeit IS NOT NULL
+        AND tatsaechliche_zeit > 0`;
+    const windowClause = lookbackDays > 0 ? 'AND datum >= date(\'now\', ?)' : '';
+    const windowParams = lookbackDays > 0 ? [`-${lookbackDays} day`] : [];
+
+    const rows = await allAsync(`
+      SELECT
+        -- neue Termine werden unabhängig vom Datum per since_id abgerufen
+        (SELECT MAX(id) FROM termine WHERE ${baseFilter}) as max_id,
+        COUNT(*) as total,
+        SUM(CASE WHEN status = 'abgeschlossen' THEN 1 ELSE 0 END) as abgeschlossen,
+        SUM(CASE WHEN ki_training_exclude = 1 THEN 1 ELSE 0 END) as ausgeschlossen,
+        TOTAL(tatsaechliche_zeit) as summe_zeit,
+        -- Korrekturen an Text oder Datum ändern weder Anzahl noch max_id;
+        -- mit der id gewichtet fallen sie in der Summe auf
+        TOTAL(id * LENGTH(arbeit)) as summe_text,
+        TOTAL(id * COALESCE(julianday(datum) - 2451545, 0)) as summe_datum
+      FROM termine
+      WHERE ${baseFilter}
+        ${windowClause}
+    `, windowParams);
+    const row = rows?.[0] || {};
+    const watermark = {
+      max_id: row.max_id || 0,
+      total: row.total || 0,
+      abgeschlossen: row.abgeschlossen || 0,
+      ausgeschlossen: row.ausgeschlossen || 0,
+      summe_zeit: row.summe_zeit || 0,
+      summe_text: row.summe_text || 0,
+      summe_datum: row.summe_datum || 0
+    };
+    const etag = `"${lookbackDays}-${watermark.max_id}-${watermark.total}-${watermark.abgeschlossen}-${watermark.ausgeschlossen}-${watermark.summe_zeit}-${watermark.summe_text}-${watermark.summe_datum}"`;
+
+    res.set('ETag', etag);
+    if (req.headers['if-none-match'] === etag) {
+      return res.status(304).end();
+    }
+
+    res.json({
+      success: true,
+      data: { ...watermark, lookback_days: lookbackDays || null, etag }
+    });
+
+  } catch (error) {
+    console.error('getTrainingDataWatermark Fehler:', error);
+    res.status(500).json({ error: error.message });
+  }
+}
+
 /**
  * POST /api/ai/training-data/:id/exclude
  * Schließt einen Termin vom Training aus
@@ -1524,6 +1611,7 @@ module.exports = {
   checkTeileKompatibilitaet,
   // Training Data Management
   getTrainingData,
+  getTrainingDataWatermark,
   excludeFromTraining,
   excludeAllOutliers,
   retrainModel,
@@ -197,6 +197,12 @@ router.post('/vin-teile-check', aiController.checkTeileKompatibilitaet);
  */
 router.get('/training-data', aiController.getTrainingData);
 
+/**
+ * GET /api/ai/training-data/watermark
+ * Günstiger Änderungsstand der Trainingsdaten (max_id, Zähler, ETag)
+ */
+router.get('/training-data/watermark', aiController.getTrainingDataWatermark);
+
 // Automatisierungs-Endpoints
 router.get('/zeit-vorschlag', aiController.getZeitVorschlag);
 router.get('/puffer-empfehlung', aiController.getPufferEmpfehlung);
@@ -0,0 +1,106 @@
+// backend/tests/aiTrainingData.test.js
+const { createTestDb, closeTestDb, dbRun, dbAll } = require('./helpers/testSetup');
+
+// Controller liest über dbHelper → auf die isolierte Test-DB umleiten
+let mockDb;
+jest.mock('../src/utils/dbHelper', () => {
+  const helpers = require('./helpers/testSetup');
+  return {
+    allAsync: (sql, params) => helpers.dbAll(mockDb, sql, params),
+    runAsync: (sql, params) => helpers.dbRun(mockDb, sql, params)
+  };
+});
+jest.mock('../src/services/openaiService', () => ({}));
+jest.mock('../src/services/localAiService', () => ({}));
+jest.mock('../src/services/externalAiService', () => ({}));
+jest.mock('../src/services/ollamaService', () => ({ setModel: jest.fn() }));
+jest.mock('../src/services/kiDiscoveryService', () => ({}));
+jest.mock('../src/models/einstellungenModel', () => ({
+  getWerkstatt: jest.fn().mockResolvedValue({})
+}));
+
+const aiController = require('../src/controllers/aiController');
+
+// Spalten aus späteren Migrationen, die das manuelle Test-Schema nicht kennt
+async function ensureTrainingColumns(db) {
+  const cols = (await dbAll(db, `PRAGMA table_info(termine)`)).map(c => c.name);
+  const required = {
+    tatsaechliche_zeit: 'INTEGER',
+    ki_training_exclude: 'INTEGER DEFAULT 0',
+    ki_training_note: 'TEXT'
+  };
+  for (const [name, type] of Object.entries(required)) {
+    if (!cols.includes(name)) {
+      await dbRun(db, `ALTER TABLE termine ADD COLUMN ${name} ${type}`);
+    }
+  }
+}
+
+function mockResponse() {
+  const res = {};
+  res.status = jest.fn(() => res);
+  res.set = jest.fn(() => res);
+  res.json = jest.fn((body) => { res.body = body; return res; });
+  return res;
+}
+
+async function getTrainingData(query) {
+  const res = mockResponse();
+  await aiController.getTrainingData({ query, headers: {} }, res);
+  expect(res.status).not.toHaveBeenCalled();
+  return res.body.data;
+}
+
+const ANZAHL = 23;
+
+describe('GET /api/ai/training-data - Keyset-Paging', () => {
+  beforeEach(async () => {
+    mockDb = await createTestDb();
+    await ensureTrainingColumns(mockDb);
+    // Dauer fällt mit steigender id: nach Dauer sortiert kämen die ältesten Termine zuerst
+    for (let i = 1; i <= ANZAHL; i++) {
+      await dbRun(mockDb, `INSERT INTO termine (id, termin_nr, kennzeichen, datum, arbeit, status, geschaetzte_zeit, tatsaechliche_zeit)
+        VALUES (?, ?, 'AB-123', '2020-01-01', ?, 'abgeschlossen', 60, ?)`,
+      [i, `T-KI-${i}`, `Arbeit ${i}`, 1000 - i]);
+    }
+  });
+
+  afterEach(async () => {
+    await closeTestDb(mockDb);
+  });
+
+  test('Seite mit limit ist absteigend nach id sortiert', async () => {
+    const data = await getTrainingData({ limit: '5' });
+    expect(data.termine.map(t => t.id)).toEqual([23, 22, 21, 20, 19]);
+    expect(data.meta.max_id).toBe(ANZAHL);
+  });
+
+  test('max_id begrenzt die Seite inklusive nach oben', async () => {
+    const data = await getTrainingData({ limit: '5', max_id: '10' });
+    expect(data.termine.map(t => t.id)).toEqual([10, 9, 8, 7, 6]);
+    expect(data.meta.page_max_id).toBe(10);
+  });
+
+  test('Seitenweiser Abruf ohne Lookback liefert jeden Termin genau einmal', async () => {
+    // Ablauf wie im KI-Service: Cursor = kleinste id der Seite - 1
+    const ids = [];
+    let cursor = 0;
+    for (;;) {
+      const query = { limit: '5' };
+      if (cursor > 0) query.max_id = String(cursor);
+      const page = (await getTrainingData(query)).termine.map(t => t.id);
+      ids.push(...page);
+      if (page.length < 5 || Math.min(...page) <= 1) break;
+      cursor = Math.min(...page) - 1;
+    }
+    expect(ids).toHaveLength(ANZAHL);
+    expect(new Set(ids).size).toBe(ANZAHL);
+  });
+
+  test('Übersicht ohne Parameter bleibt nach Dauer sortiert', async () => {
+    const data = await getTrainingData({});
+    const zeiten = data.termine.map(t => t.tatsaechliche_zeit);
+    expect(zeiten).toEqual([...zeiten].sort((a, b) => b - a));
+    expect(data.termine).toHaveLength(ANZAHL);
+  });
+});
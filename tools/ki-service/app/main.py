@@ -1,69 +1,268 @@
+import codecs
+import copy
+import hashlib
+import importlib
+import json
 import logging
+import multiprocessing
 import os
+import re
 import socket
+import sqlite3
+import sys
 import threading
 import time
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Optional
+from urllib.request import pathname2url
 
-import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import Ridge
-from sklearn.metrics.pairwise import cosine_similarity
-import joblib
-from zeroconf import ServiceBrowser, ServiceInfo, Zeroconf
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import fcntl
+except ImportError:  # Windows: keine Trainer-Wahl, jeder Prozess trainiert selbst
+    fcntl = None
+
+
+class LazyImport:
+    """
+    Platzhalter fuer ein schweres Modul (oder ein Attribut daraus), das erst
+    beim ersten Zugriff importiert wird. Danach ersetzt es den globalen Namen
+    durch das echte Objekt; spaetere Zugriffe kosten nichts extra.
+    """
+
+    registry = []
+    timings = {}
+
+    def __init__(self, alias: str, module: str, attr: Optional[str] = None) -> None:
+        self._alias = alias
+        self._module = module
+        self._attr = attr
+        LazyImport.registry.append(self)
+
+    def resolve(self):
+        # nur echte Importe messen, nicht Module, die z.B. joblib.load schon geladen hat
+        fresh = self._module not in sys.modules
+        start = time.perf_counter()
+        loaded = module = importlib.import_module(self._module)
+        if self._attr:
+            loaded = getattr(module, self._attr)
+        if fresh:
+            LazyImport.timings.setdefault(self._module, round((time.perf_counter() - start) * 1000, 1))
+        globals()[self._alias] = loaded
+        return loaded
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+
+# numpy/scipy/sklearn/joblib/zeroconf brauchen zusammen >1 s Importzeit; /health
+# soll sofort antworten, daher erst bei Bedarf bzw. im Hintergrund (warm_imports)
+np = LazyImport('np', 'numpy')
+sparse = LazyImport('sparse', 'scipy.sparse')
+joblib = LazyImport('joblib', 'joblib')
+HashingVectorizer = LazyImport('HashingVectorizer', 'sklearn.feature_extraction.text', 'HashingVectorizer')
+TfidfVectorizer = LazyImport('TfidfVectorizer', 'sklearn.feature_extraction.text', 'TfidfVectorizer')
+Ridge = LazyImport('Ridge', 'sklearn.linear_model', 'Ridge')
+SGDRegressor = LazyImport('SGDRegressor', 'sklearn.linear_model', 'SGDRegressor')
+normalize_rows = LazyImport('normalize_rows', 'sklearn.preprocessing', 'normalize')
+ServiceBrowser = LazyImport('ServiceBrowser', 'zeroconf', 'ServiceBrowser')
+ServiceInfo = LazyImport('ServiceInfo', 'zeroconf', 'ServiceInfo')
+Zeroconf = LazyImport('Zeroconf', 'zeroconf', 'Zeroconf')
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.abspath(os.path.join(APP_DIR, '..'))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
+# Altes Einzeldatei-Format, wird beim naechsten Speichern abgeloest
 MODEL_PATH = os.path.join(DATA_DIR, 'model.joblib')
+# Aufgeteiltes Format: Arrays per mmap, Training-Cache getrennt und erst bei Bedarf
+MODEL_DIR = os.path.join(DATA_DIR, 'model')
+MODEL_MANIFEST = os.path.join(MODEL_DIR, 'manifest.json')
+MODEL_FORMAT = 2
+# Feste Namen frueherer Versionen; neue Staende heissen <teil>-<generation>.joblib
+MODEL_FILES = {
+    'model': 'model.joblib',
+    'tasks': 'tasks.joblib',
+    'training': 'training.joblib'
+}
 MODEL_BACKUP_DIR = os.path.join(DATA_DIR, 'backups')
+# Backups: Dateien nach Inhalts-Hash (hart verlinkt), Zuordnung in index.json
+BACKUP_OBJECTS_DIR = os.path.join(MODEL_BACKUP_DIR, 'objects')
+BACKUP_INDEX = os.path.join(MODEL_BACKUP_DIR, 'index.json')
+BACKUP_KEEP_COUNT = 5
+# Mehrere uvicorn-Worker: wer die Sperre haelt, trainiert; die anderen laden nach
+TRAINER_LOCK_PATH = os.path.join(DATA_DIR, 'trainer.lock')
+CONTROL_PATH = os.path.join(DATA_DIR, 'control.json')
+SHARD_DIR = os.path.join(DATA_DIR, 'shards')
 
 BACKEND_URL = os.environ.get('BACKEND_URL', '').rstrip('/')
 SERVICE_PORT = int(os.environ.get('SERVICE_PORT', '5000'))
 TRAINING_INTERVAL_MINUTES = int(os.environ.get('TRAINING_INTERVAL_MINUTES', '1440'))
+TRAINING_POLL_SECONDS = int(os.environ.get('TRAINING_POLL_SECONDS', '60'))
+TRAINING_DEBOUNCE_SECONDS = int(os.environ.get('TRAINING_DEBOUNCE_SECONDS', '120'))
+TRAINING_DEBOUNCE_MAX_SECONDS = int(os.environ.get('TRAINING_DEBOUNCE_MAX_SECONDS', '900'))
 TRAINING_LIMIT = int(os.environ.get('TRAINING_LIMIT', '0'))
 TRAINING_LOOKBACK_DAYS = int(os.environ.get('TRAINING_LOOKBACK_DAYS', '90'))
 TRAINING_MAX_RETRIES = int(os.environ.get('TRAINING_MAX_RETRIES', '5'))
 TRAINING_BACKOFF_INITIAL_SECONDS = float(os.environ.get('TRAINING_BACKOFF_INITIAL_SECONDS', '5'))
 TRAINING_BACKOFF_MAX_SECONDS = float(os.environ.get('TRAINING_BACKOFF_MAX_SECONDS', '300'))
 BACKEND_TIMEOUT_SECONDS = float(os.environ.get('BACKEND_TIMEOUT_SECONDS', '5'))
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '4'))
+# Eintraege im LRU-Cache fuer Vorhersagen (0 = aus)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '4096'))
+# Bulk-Schaetzung: Datensaetze je Vorhersage-Block, max. Groesse eines Datensatzes
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', '200'))
+BULK_MAX_RECORD_BYTES = int(os.environ.get('BULK_MAX_RECORD_BYTES', str(1024 * 1024)))
+TRAINING_PAGE_SIZE = int(os.environ.get('TRAINING_PAGE_SIZE', '500'))
+# Optional: werkstatt.db direkt lesen, wenn der KI-Service auf dem Backend-Rechner laeuft
+TRAINING_DB_PATH = os.environ.get('TRAINING_DB_PATH', '').strip()
+# 'full' = TF-IDF + Ridge komplett neu, 'incremental' = Hashing + SGD partial_fit
+TRAINING_MODE = os.environ.get('TRAINING_MODE', 'full').strip().lower()
+TRAINING_FULL_REBUILD_EVERY = int(os.environ.get('TRAINING_FULL_REBUILD_EVERY', '50'))
+TRAINING_FULL_REBUILD_HOURS = float(os.environ.get('TRAINING_FULL_REBUILD_HOURS', '24'))
+TRAINING_INCREMENTAL_EPOCHS = int(os.environ.get('TRAINING_INCREMENTAL_EPOCHS', '5'))
+HASHING_FEATURES = 2 ** 18
+# Ziel je eindeutigem Text: 'mean' (entspricht dem Fit ueber alle Zeilen) oder 'median' (robust)
+TRAINING_AGGREGATE_TARGET = os.environ.get('TRAINING_AGGREGATE_TARGET', 'mean').strip().lower()
+TRAINING_WORKER_PROCESS = os.environ.get('TRAINING_WORKER_PROCESS', '1') != '0'
+# 'kategorie': zusaetzlich ein Modell je Kategorie, das globale Modell dient als Fallback
+TRAINING_SHARDS = os.environ.get('TRAINING_SHARDS', '').strip().lower()
+SHARD_MIN_SAMPLES = int(os.environ.get('SHARD_MIN_SAMPLES', '50'))
+TRAINING_SHARD_WORKERS = int(os.environ.get('TRAINING_SHARD_WORKERS', str(min(os.cpu_count() or 1, 4))))
+# CPU-Zeit und Speicherspitze (tracemalloc) je Trainingsphase erfassen; bremst Allokationen, daher nur bei Bedarf
+TRAINING_PROFILE = os.environ.get('TRAINING_PROFILE', '0') == '1'
+TRAINING_PROFILE_HISTORY = int(os.environ.get('TRAINING_PROFILE_HISTORY', '20'))
 DISCOVERY_ENABLED = os.environ.get('DISCOVERY_ENABLED', '1') != '0'
 BACKEND_DISCOVERY_ENABLED = os.environ.get('BACKEND_DISCOVERY_ENABLED', '1') != '0'
+# Wartezeit, bevor ein Client-Host ohne erreichbares Backend erneut geprueft wird
+BACKEND_PROBE_RETRY_SECONDS = float(os.environ.get('BACKEND_PROBE_RETRY_SECONDS', '300'))
+# Optionale JSON-Datei mit eigenen Schluesselwort-Tabellen (kategorien, prioritaet, teile)
+KEYWORD_TABLES_PATH = os.environ.get('KEYWORD_TABLES_PATH', '').strip()
+# Wie oft Worker ohne Trainer-Rolle Manifest und Steuerdatei pruefen
+MODEL_WATCH_SECONDS = float(os.environ.get('MODEL_WATCH_SECONDS', '2'))
 
 DEFAULT_MINUTES = 60
 MIN_MINUTES = 5
 MAX_MINUTES = 480
 SUGGESTION_LIMIT = 5
+# Inkrementelle Updates haengen je einen Index-Block an; ab dieser Anzahl wird zusammengefuehrt
+SUGGESTION_INDEX_MAX_BLOCKS = 8
 
 logging.basicConfig(level=logging.INFO, format='[KI] %(message)s')
 
 app = FastAPI(title='Werkstatt KI Service', version='1.0')
 
+
+class MetricsMiddleware:
+    """
+    Reine ASGI-Middleware fuer /metrics: Latenz je Route und laufende
+    Requests. Den Request-Body reicht sie unveraendert durch (Bulk-Streaming).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = {'code': 500}
+
+        async def send_with_status(message) -> None:
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        with _metrics_lock:
+            _metrics['in_flight'] += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            with _metrics_lock:
+                _metrics['in_flight'] -= 1
+            # Route-Vorlage statt Pfad, damit die Anzahl Label-Werte begrenzt bleibt
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            record_request(route, scope.get('method', ''), status['code'], time.perf_counter() - start)
+
+
+app.add_middleware(MetricsMiddleware)
+
 _model_lock = threading.Lock()
 _train_lock = threading.Lock()
+# Trainings- und Betriebszustand; das Modell selbst liegt in _model_snapshot.
+# Schreiber halten _model_lock, Leser (Handler) lesen einzelne Werte ohne Lock.
 _model_state = {
-    'vectorizer': None,
-    'regressor': None,
-    'task_texts': [],
-    'task_matrix': None,
-    'trained_at': 0,
-    'samples': 0,
     'training_in_progress': False,
     'last_train_request_at': 0,
     'last_training_duration': 0,
     'total_trainings': 0,
     'last_error': None,
-    'last_backup_at': 0
+    'last_backup_at': 0,
+    'model_exists': False,
+    'model_size_bytes': 0,
+    'backup_count': 0
 }
+# Felder, die ein Training als Einheit veroeffentlicht
+MODEL_KEYS = (
+    'vectorizer', 'regressor', 'task_texts', 'task_matrix', 'task_counts',
+    'task_medians', 'task_minutes', 'task_kategorien', 'task_teile',
+    'task_index', 'task_keyword_version', 'shards', 'model_mode',
+    'full_trained_at', 'incremental_updates'
+)
+# Aufteilung auf die Dateien in MODEL_DIR (Rest von MODEL_KEYS -> model.joblib)
+TASK_KEYS = (
+    'task_texts', 'task_matrix', 'task_counts', 'task_medians', 'task_minutes',
+    'task_kategorien', 'task_teile', 'task_index'
+)
+TRAINING_KEYS = ('training_cache', 'feature_cache', 'last_id')
+_training_pool = None
+_training_pool_lock = threading.Lock()
 
 _zeroconf = None
 _service_info = None
 _backend_zeroconf = None
 _backend_browser = None
 _backend_lock = threading.Lock()
+_backend_probe_lock = threading.Lock()
+_backend_probes_running = set()
+# Client-Host -> Zeitpunkt der letzten erfolglosen Pruefung, aelteste zuerst
+_backend_probe_failures = {}
+_http_session = None
+_http_lock = threading.Lock()
+_http_metrics = {}
+_metrics_lock = threading.Lock()
+# Startzeiten in Sekunden seit Prozessstart bzw. Dauer je Phase in ms
+_startup = {'module_loaded_s': None, 'ready': False, 'ready_s': None, 'phases_ms': {}}
+_trainer_lock_file = None
+_persist_lock = threading.Lock()
+_save_condition = threading.Condition()
+_save_queue = {'state': None, 'running': False}
+_reload_lock = threading.Lock()
+_worker_state = {
+    'role': 'starting',
+    'manifest_token': None,
+    'control_token': None,
+    'control': {},
+    'model_reloads': 0,
+    # Retrain-Anforderungen vor dem Prozessstart stammen aus einem frueheren Lauf
+    'started_at': time.time(),
+    'retrain_started_at': 0
+}
 
 KATEGORIEN = [
     ('Inspektion', ['inspektion', 'service', 'wartung', 'durchsicht']),
@@ -86,6 +285,127 @@ TEILE_HINTS = [
     (['luftfilter'], ['Luftfilter'])
 ]
 
+# Erster Treffer gewinnt; ohne Treffer 'niedrig', bei leerem Text 'mittel'
+PRIORITAET_HINTS = [
+    ('hoch', ['dringend', 'sofort', 'notfall']),
+    ('hoch', ['brem', 'lenk', 'unfall']),
+    ('mittel', ['bald', 'zeitnah', 'demnaechst'])
+]
+
+
+def _trie_pattern(words) -> str:
+    """
+    Regex als Praefixbaum (z.B. brems(?:e)?): pro Textposition wird nur der
+    passende Zweig verfolgt, laengere Woerter haben Vorrang.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordEngine:
+    """
+    Kategorie, Prioritaet und Teile-Hinweise in einem Durchlauf ueber den
+    normalisierten Text. Alle Schluesselwoerter stecken in einer kompilierten
+    Alternation; per Lookahead wird an jeder Position das laengste Wort
+    gefunden, kuerzere darin enthaltene Woerter sind in dessen vorberechneten
+    Treffern enthalten. Das Ergebnis entspricht damit `key in norm` je Wort.
+    """
+
+    def __init__(self, kategorien: list, prioritaet: list, teile: list) -> None:
+        self.kategorien = [(name, frozenset(normalize_text(k) for k in keys)) for name, keys in kategorien]
+        self.prioritaet = [(name, frozenset(normalize_text(k) for k in keys)) for name, keys in prioritaet]
+        self.teile = [(frozenset(normalize_text(k) for k in keys), list(items)) for keys, items in teile]
+
+        words = set()
+        for _, keys in self.kategorien + self.prioritaet:
+            words |= keys
+        for keys, _ in self.teile:
+            words |= keys
+        words.discard('')
+        # je Wort: (Rang der Kategorie, Rang der Prioritaet, Bitmaske der Teile-Regeln),
+        # einschliesslich aller kuerzeren Woerter, die darin enthalten sind
+        self.word_hits = {}
+        for word in words:
+            contained = [other for other in words if other in word]
+            self.word_hits[word] = (
+                min((rank for rank, (_, keys) in enumerate(self.kategorien) if not keys.isdisjoint(contained)), default=len(self.kategorien)),
+                min((rank for rank, (_, keys) in enumerate(self.prioritaet) if not keys.isdisjoint(contained)), default=len(self.prioritaet)),
+                sum(1 << rank for rank, (keys, _) in enumerate(self.teile) if not keys.isdisjoint(contained))
+            )
+        pattern = _trie_pattern(words)
+        self.findall = re.compile(f'(?=({pattern}))').findall if pattern else None
+        self._teile_by_mask = {}
+        self.version = hashlib.sha1(
+            json.dumps([kategorien, prioritaet, teile], ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:12]
+
+    def _teile_for(self, mask: int) -> tuple:
+        teile = self._teile_by_mask.get(mask)
+        if teile is None:
+            names = []
+            for rank, (_, items) in enumerate(self.teile):
+                if mask >> rank & 1:
+                    names.extend(item for item in items if item not in names)
+            teile = self._teile_by_mask[mask] = tuple(names)
+        return teile
+
+    def analyze(self, norm: str) -> dict:
+        """Liefert {'kategorie', 'prioritaet', 'teile'} fuer einen normalisierten Text."""
+        kategorie_rank, prioritaet_rank, mask = len(self.kategorien), len(self.prioritaet), 0
+        if self.findall is not None:
+            for word in set(self.findall(norm)):
+                k, p, t = self.word_hits[word]
+                if k < kategorie_rank:
+                    kategorie_rank = k
+                if p < prioritaet_rank:
+                    prioritaet_rank = p
+                mask |= t
+        if not norm:
+            prioritaet = 'mittel'
+        elif prioritaet_rank < len(self.prioritaet):
+            prioritaet = self.prioritaet[prioritaet_rank][0]
+        else:
+            prioritaet = 'niedrig'
+        return {
+            'kategorie': self.kategorien[kategorie_rank][0] if kategorie_rank < len(self.kategorien) else 'Sonstiges',
+            'prioritaet': prioritaet,
+            'teile': self._teile_for(mask)
+        }
+
+
+def load_keyword_engine() -> KeywordEngine:
+    """
+    Baut die Schluesselwort-Engine aus den eingebauten Tabellen; einzelne
+    Tabellen koennen per KEYWORD_TABLES_PATH (JSON) ersetzt werden.
+    """
+    tables = {'kategorien': KATEGORIEN, 'prioritaet': PRIORITAET_HINTS, 'teile': TEILE_HINTS}
+    if KEYWORD_TABLES_PATH:
+        try:
+            with open(KEYWORD_TABLES_PATH, encoding='utf-8') as handle:
+                custom = json.load(handle)
+            for key in tables:
+                if key in custom:
+                    tables[key] = custom[key]
+            logging.info('Schluesselwort-Tabellen geladen: %s', KEYWORD_TABLES_PATH)
+        except Exception as err:
+            logging.warning('Schluesselwort-Tabellen konnten nicht geladen werden: %s', err)
+    return KeywordEngine(tables['kategorien'], tables['prioritaet'], tables['teile'])
+
 
 class ArbeitenRequest(BaseModel):
     beschreibung: str
@@ -97,43 +417,541 @@ class ZeitRequest(BaseModel):
     fahrzeug: Optional[str] = None
 
 
+class TrainingCache:
+    """
+    Spaltenorientierter Training-Cache: IDs, Datum (JJJJMMTT), Minuten und
+    Text-IDs liegen in gepackten Arrays, Texte in einer internierten Tabelle.
+    Upsert und Loeschen sind O(1) (Loeschen tauscht mit der letzten Zeile).
+    """
+
+    def __init__(self) -> None:
+        self._ids = array('q')
+        self._dates = array('i')
+        self._minutes = array('d')
+        self._text_ids = array('i')
+        self._texts = []
+        self._text_refs = array('i')
+        self._text_index = {}
+        self._free_texts = []
+        self._rows = {}
+
+    @classmethod
+    def from_entries(cls, entries) -> 'TrainingCache':
+        cache = cls()
+        for entry in entries:
+            cache.upsert(entry['id'], entry.get('datum'), entry['text'], entry['minutes'])
+        return cache
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, tid: int) -> bool:
+        return tid in self._rows
+
+    def __getstate__(self) -> dict:
+        # Zeilenindex und Text-Lookup werden beim Laden neu aufgebaut
+        return {
+            'ids': self._ids,
+            'dates': self._dates,
+            'minutes': self._minutes,
+            'text_ids': self._text_ids,
+            'texts': self._texts,
+            'text_refs': self._text_refs
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self._ids = state['ids']
+        self._dates = state['dates']
+        self._minutes = state['minutes']
+        self._text_ids = state['text_ids']
+        self._texts = state['texts']
+        self._text_refs = state['text_refs']
+        self._rows = {tid: row for row, tid in enumerate(self._ids)}
+        self._text_index = {}
+        self._free_texts = []
+        for text_id, text in enumerate(self._texts):
+            if self._text_refs[text_id] > 0:
+                self._text_index[text] = text_id
+            else:
+                self._free_texts.append(text_id)
+
+    @staticmethod
+    def _encode_date(datum) -> int:
+        value = str(datum or '')[:10].replace('-', '')
+        return int(value) if len(value) == 8 and value.isdigit() else 0
+
+    @staticmethod
+    def _decode_date(value: int) -> Optional[str]:
+        if not value:
+            return None
+        return f'{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}'
+
+    def _intern(self, text: str) -> int:
+        text_id = self._text_index.get(text)
+        if text_id is None:
+            if self._free_texts:
+                text_id = self._free_texts.pop()
+                self._texts[text_id] = text
+            else:
+                text_id = len(self._texts)
+                self._texts.append(text)
+                self._text_refs.append(0)
+            self._text_index[text] = text_id
+        self._text_refs[text_id] += 1
+        return text_id
+
+    def _release(self, text_id: int) -> None:
+        self._text_refs[text_id] -= 1
+        if self._text_refs[text_id] <= 0:
+            del self._text_index[self._texts[text_id]]
+            self._texts[text_id] = ''
+            self._free_texts.append(text_id)
+
+    def get(self, tid: int) -> Optional[dict]:
+        row = self._rows.get(tid)
+        if row is None:
+            return None
+        return {
+            'id': tid,
+            'datum': self._decode_date(self._dates[row]),
+            'text': self._texts[self._text_ids[row]],
+            'minutes': self._minutes[row]
+        }
+
+    def upsert(self, tid: int, datum, text: str, minutes: float) -> Optional[str]:
+        """Liefert 'added', 'changed' oder None (unveraendert)."""
+        date_value = self._encode_date(datum)
+        row = self._rows.get(tid)
+        if row is None:
+            self._rows[tid] = len(self._ids)
+            self._ids.append(tid)
+            self._dates.append(date_value)
+            self._minutes.append(minutes)
+            self._text_ids.append(self._intern(text))
+            return 'added'
+
+        old_text_id = self._text_ids[row]
+        if (
+            self._dates[row] == date_value
+            and self._minutes[row] == minutes
+            and self._texts[old_text_id] == text
+        ):
+            return None
+        self._dates[row] = date_value
+        self._minutes[row] = minutes
+        if self._texts[old_text_id] != text:
+            self._text_ids[row] = self._intern(text)
+            self._release(old_text_id)
+        return 'changed'
+
+    def remove(self, tid: int) -> bool:
+        row = self._rows.pop(tid, None)
+        if row is None:
+            return False
+        self._release(self._text_ids[row])
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._dates[row] = self._dates[last]
+            self._minutes[row] = self._minutes[last]
+            self._text_ids[row] = self._text_ids[last]
+            self._rows[moved] = row
+        for column in (self._ids, self._dates, self._minutes, self._text_ids):
+            column.pop()
+        return True
+
+    def ids(self) -> list:
+        return self._ids.tolist()
+
+    def texts(self, tids=None) -> list:
+        if tids is None:
+            return [self._texts[text_id] for text_id in self._text_ids]
+        return [self._texts[self._text_ids[self._rows[tid]]] for tid in tids]
+
+    def minutes(self, tids=None) -> 'np.ndarray':
+        if tids is None:
+            return np.frombuffer(self._minutes, dtype=np.float64).copy()
+        return np.array([self._minutes[self._rows[tid]] for tid in tids], dtype=np.float64)
+
+
+class TextColumn:
+    """
+    Unveraenderliche Textliste als zwei numpy-Arrays (UTF-8-Bytes und Offsets),
+    damit sie per mmap geladen werden kann. Mit separator liefert jeder
+    Eintrag eine Liste (z.B. Teile-Namen je Task).
+    """
+
+    def __init__(self, data, offsets, separator: Optional[str] = None) -> None:
+        self.data = data
+        self.offsets = offsets
+        self.separator = separator
+
+    @classmethod
+    def from_list(cls, items, separator: Optional[str] = None) -> 'TextColumn':
+        if separator is not None:
+            items = [separator.join(item) for item in items]
+        encoded = [str(item).encode('utf-8') for item in items]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).copy()
+        return cls(data, offsets, separator)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _item(self, index: int):
+        text = self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+        if self.separator is None:
+            return text
+        return text.split(self.separator) if text else []
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._item(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._item(index)
+
+
+class TermIndex:
+    """
+    Read-only Ersatz fuer vocabulary_ eines TfidfVectorizers: sortierte Terme
+    als Bytes-Array plus Spaltennummern, Lookup per np.searchsorted. Laedt per
+    mmap, statt beim Start ein dict mit allen N-Grammen aufzubauen.
+    """
+
+    def __init__(self, terms, columns) -> None:
+        self.terms = terms
+        self.columns = columns
+
+    @classmethod
+    def from_dict(cls, vocabulary: dict) -> 'TermIndex':
+        items = sorted((term.encode('utf-8'), column) for term, column in vocabulary.items())
+        terms = np.array([term for term, _ in items], dtype=bytes)
+        columns = np.array([column for _, column in items], dtype=np.int64)
+        return cls(terms, columns)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __getitem__(self, term: str) -> int:
+        key = term.encode('utf-8')
+        pos = int(np.searchsorted(self.terms, key))
+        if pos < len(self.terms) and self.terms[pos] == key:
+            return int(self.columns[pos])
+        raise KeyError(term)
+
+    def get(self, term: str, default=None):
+        try:
+            return self[term]
+        except KeyError:
+            return default
+
+    def __contains__(self, term) -> bool:
+        return self.get(term) is not None
+
+    def __iter__(self):
+        for term in self.terms:
+            yield term.decode('utf-8')
+
+    def items(self):
+        for term, column in zip(self.terms, self.columns):
+            yield term.decode('utf-8'), int(column)
+
+
 def normalize_text(text: str) -> str:
-    return (
-        str(text or '')
-        .lower()
-        .replace('ä', 'ae')
-        .replace('ö', 'oe')
-        .replace('ü', 'ue')
-        .replace('ß', 'ss')
-        .replace('-', ' ')
-        .replace('_', ' ')
-        .strip()
-    )
+    return str(text or '').lower().translate(_NORMALIZE_TABLE).strip()
+
+
+_NORMALIZE_TABLE = str.maketrans({
+    'ä': 'ae',
+    'ö': 'oe',
+    'ü': 'ue',
+    'ß': 'ss',
+    '-': ' ',
+    '_': ' '
+})
+# Bei jeder Aenderung an normalize_text erhoehen (verwirft den FeatureCache)
+NORMALIZER_VERSION = 2
+_word_analyzer = None
+_keyword_engine = load_keyword_engine()
+
+
+class FeatureCache:
+    """
+    Memo ueber Trainingszyklen: Rohtext -> normalisierter Text -> N-Gramme.
+    Nur neue Texte werden normalisiert bzw. tokenisiert. Der Cache wird mit dem
+    Modell gespeichert und bei geaenderter NORMALIZER_VERSION verworfen.
+    """
+
+    def __init__(self) -> None:
+        self.version = NORMALIZER_VERSION
+        self.normalized = {}
+        self.ngrams = {}
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, raw: str) -> str:
+        norm = self.normalized.get(raw)
+        if norm is None:
+            norm = normalize_text(raw)
+            self.normalized[raw] = norm
+            self.misses += 1
+        else:
+            self.hits += 1
+        return norm
+
+    def analyze(self, texts: list) -> list:
+        """N-Gramme wie TfidfVectorizer(ngram_range=(1, 2)) sie erzeugt."""
+        result = []
+        for text in texts:
+            tokens = self.ngrams.get(text)
+            if tokens is None:
+                tokens = word_analyzer()(text)
+                self.ngrams[text] = tokens
+                self.misses += 1
+            else:
+                self.hits += 1
+            result.append(tokens)
+        return result
+
+    def prune(self, texts: set) -> None:
+        """Entfernt Eintraege zu Texten, die nicht mehr im Training-Cache sind."""
+        self.ngrams = {text: tokens for text, tokens in self.ngrams.items() if text in texts}
+        self.normalized = {raw: norm for raw, norm in self.normalized.items() if norm in texts}
+
+    def __getstate__(self) -> dict:
+        return {'version': self.version, 'normalized': self.normalized, 'ngrams': self.ngrams}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+        if state.get('version') == NORMALIZER_VERSION:
+            self.normalized = state.get('normalized', {})
+            self.ngrams = state.get('ngrams', {})
+
+
+def word_analyzer():
+    # erst beim ersten Training bauen, der Import von sklearn ist teuer
+    global _word_analyzer
+    if _word_analyzer is None:
+        _word_analyzer = TfidfVectorizer(ngram_range=(1, 2)).build_analyzer()
+    return _word_analyzer
+
+
+def _pre_analyzed(tokens: list) -> list:
+    # Analyzer fuer bereits tokenisierte Eingaben (FeatureCache.analyze)
+    return tokens
+
+
+def _fit_transform_tokens(vectorizer, tokens: list):
+    """
+    Fit/Transform auf vorberechneten N-Grammen; danach arbeitet der Vectorizer
+    wieder mit dem normalen Wort-Analyzer, fuer Vorhersagen aendert sich nichts.
+    """
+    vectorizer.set_params(analyzer=_pre_analyzed, ngram_range=(1, 1))
+    X = vectorizer.fit_transform(tokens)
+    vectorizer.set_params(analyzer='word', ngram_range=(1, 2))
+    return X
+
+
+class PredictionCache:
+    """
+    Begrenzter LRU-Cache fuer Vorhersagen: (Art, normalisierter Text) -> Ergebnis.
+    Gilt nur fuer einen Modellstand (ModelSnapshot.version); sobald ein
+    anderer Stand abgefragt wird, wird der Cache geleert.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.version = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, version) -> None:
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = version
+
+    def get(self, kind: str, text: str, version):
+        if self.max_size <= 0:
+            return None
+        key = (kind, text)
+        with self.lock:
+            self._check_version(version)
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, kind: str, text: str, version, value) -> None:
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self._check_version(version)
+            self.entries[(kind, text)] = value
+            self.entries.move_to_end((kind, text))
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'model_version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
+
+
+_prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE)
+# Schluesselwort-Hinweise haengen nur an den Tabellen (KeywordEngine.version),
+# nicht am Modellstand: eigener Cache, den ein neues Modell nicht leert
+_keyword_cache = PredictionCache(PREDICTION_CACHE_SIZE)
+
+
+class ModelSnapshot:
+    """
+    Unveraenderlicher Modellstand fuer die Request-Handler: Vectorizer,
+    Regressor, Task-Tabelle/-Index und Metadaten. Ein Training veroeffentlicht
+    einen neuen Snapshot, indem es _model_snapshot austauscht; Handler lesen
+    die Referenz einmal und arbeiten ohne Lock auf einem konsistenten Stand.
+    """
+
+    __slots__ = MODEL_KEYS + ('trained_at', 'samples', 'serial')
+
+    def __init__(self, state: Optional[dict] = None, serial: int = 0) -> None:
+        state = state or {}
+        for key in MODEL_KEYS:
+            object.__setattr__(self, key, state.get(key))
+        object.__setattr__(self, 'trained_at', int(state.get('trained_at', 0) or 0))
+        object.__setattr__(self, 'samples', int(state.get('samples', 0) or 0))
+        # zaehlt jede Veroeffentlichung (trained_at hat nur Sekunden)
+        object.__setattr__(self, 'serial', serial)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError('ModelSnapshot ist unveraenderlich')
+
+    @property
+    def ready(self) -> bool:
+        return self.vectorizer is not None and self.regressor is not None
+
+    @property
+    def version(self) -> tuple:
+        return (self.trained_at, self.serial)
+
+    def model_dict(self) -> dict:
+        return {key: getattr(self, key) for key in MODEL_KEYS}
+
+
+_model_snapshot = ModelSnapshot()
+
+
+class ShardSet:
+    """
+    Kategorie-Modelle eines Trainingsstands. Jeder Shard liegt als eigene
+    Datei in SHARD_DIR und wird erst bei der ersten Vorhersage geladen
+    (numpy-Arrays per mmap). Gespeichert werden nur die Metadaten.
+    """
+
+    def __init__(self, entries: Optional[dict] = None) -> None:
+        # Name -> {'file', 'fingerprint', 'samples', 'texts', 'minutes'}
+        self.entries = entries or {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getstate__(self) -> dict:
+        # Texte je Shard als TextColumn, damit das Laden nicht mit den Tasks waechst
+        entries = {
+            name: {**meta, 'texts': meta['texts'] if isinstance(meta['texts'], TextColumn) else TextColumn.from_list(meta['texts'])}
+            for name, meta in self.entries.items()
+        }
+        return {'entries': entries}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state.get('entries'))
+
+    def get(self, name: str) -> Optional[dict]:
+        """Vectorizer/Regressor des Shards oder None (dann gilt das globale Modell)."""
+        meta = self.entries.get(name)
+        if meta is None:
+            return None
+        model = self._loaded.get(name)
+        if model is None:
+            with self._lock:
+                model = self._loaded.get(name)
+                if model is None:
+                    try:
+                        model = joblib.load(os.path.join(SHARD_DIR, meta['file']), mmap_mode='r')
+                    except Exception as err:
+                        logging.warning('Shard %s konnte nicht geladen werden: %s', name, err)
+                        model = False
+                    self._loaded[name] = model
+        return model or None
+
+    def inherit(self, previous: 'ShardSet') -> None:
+        """Uebernimmt bereits geladene, unveraenderte Shards aus dem Vorgaenger."""
+        for name, meta in self.entries.items():
+            old = previous.entries.get(name)
+            model = previous._loaded.get(name)
+            if model and old and old.get('fingerprint') == meta.get('fingerprint'):
+                self._loaded[name] = model
+
+    def files(self) -> set:
+        return {meta['file'] for meta in self.entries.values()}
+
+    def stats(self) -> dict:
+        return {
+            'count': len(self.entries),
+            'loaded': [name for name, model in self._loaded.items() if model],
+            'samples': {name: meta['samples'] for name, meta in self.entries.items()}
+        }
+
+
+def publish_model(state: dict) -> ModelSnapshot:
+    """Ersetzt den Modellstand atomar; laufende Requests behalten ihren Snapshot."""
+    global _model_snapshot
+    with _model_lock:
+        snapshot = ModelSnapshot(state, _model_snapshot.serial + 1)
+        _model_snapshot = snapshot
+    return snapshot
 
 
 def minutes_to_hours(minutes: float) -> float:
     return round(float(minutes) / 60.0, 2)
 
 
+def analyze_keywords(text: str) -> dict:
+    return _keyword_engine.analyze(normalize_text(text))
+
+
 def prioritaet_aus_text(text: str) -> str:
-    norm = normalize_text(text)
-    if not norm:
-        return 'mittel'
-    if 'dringend' in norm or 'sofort' in norm or 'notfall' in norm:
-        return 'hoch'
-    if 'brem' in norm or 'lenk' in norm or 'unfall' in norm:
-        return 'hoch'
-    if 'bald' in norm or 'zeitnah' in norm or 'demnaechst' in norm:
-        return 'mittel'
-    return 'niedrig'
+    return analyze_keywords(text)['prioritaet']
 
 
 def kategorisiere_arbeit(text: str) -> str:
-    norm = normalize_text(text)
-    for name, keys in KATEGORIEN:
-        if any(key in norm for key in keys):
-            return name
-    return 'Sonstiges'
+    return analyze_keywords(text)['kategorie']
 
 
 def ensure_data_dir() -> None:
@@ -143,32 +961,340 @@ def ensure_data_dir() -> None:
         os.makedirs(MODEL_BACKUP_DIR, exist_ok=True)
 
 
-def set_backend_url(url: str) -> None:
+def get_http_session() -> requests.Session:
+    """Gemeinsame Session mit Connection-Pool und Keep-Alive fuer alle Backend-Aufrufe."""
+    global _http_session
+    with _http_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive'
+            })
+            _http_session = session
+        return _http_session
+
+
+def reset_http_session() -> None:
+    global _http_session
+    with _http_lock:
+        session = _http_session
+        _http_session = None
+    if session is not None:
+        session.close()
+
+
+def http_get(name: str, url: str, **kwargs) -> requests.Response:
+    """GET ueber die gemeinsame Session, erfasst Latenz und Fehler je Aufrufart."""
+    start = time.perf_counter()
+    failed = False
+    try:
+        return get_http_session().get(url, **kwargs)
+    except Exception:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        with _http_lock:
+            metrics = _http_metrics.setdefault(name, {
+                'calls': 0,
+                'errors': 0,
+                'total_seconds': 0.0,
+                'last_seconds': 0.0,
+                'max_seconds': 0.0
+            })
+            metrics['calls'] += 1
+            metrics['errors'] += 1 if failed else 0
+            metrics['total_seconds'] += elapsed
+            metrics['last_seconds'] = elapsed
+            metrics['max_seconds'] = max(metrics['max_seconds'], elapsed)
+
+
+def get_http_metrics() -> dict:
+    with _http_lock:
+        return {
+            name: {
+                **metrics,
+                'avg_seconds': metrics['total_seconds'] / metrics['calls'] if metrics['calls'] else 0.0
+            }
+            for name, metrics in _http_metrics.items()
+        }
+
+
+# Grenzen in Sekunden: Requests/Inferenz im Bereich 0.1 ms bis 10 s, Trainingsphasen bis 30 min
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TRAINING_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+# laufen nach dem Training im Hintergrund (schedule_model_save) und zaehlen einzeln
+BACKGROUND_TRAINING_PHASES = ('save', 'backup')
+
+
+class Histogram:
+    """Histogramm mit festen Grenzen wie in Prometheus (kumulativ erst bei der Ausgabe)."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self) -> 'Histogram':
+        other = Histogram(self.buckets)
+        other.counts = list(self.counts)
+        other.sum = self.sum
+        other.count = self.count
+        return other
+
+
+# Zaehler fuer /metrics; Schreiben unter _metrics_lock, jeweils nur wenige Additionen
+_metrics = {
+    'in_flight': 0,
+    'requests': {},         # (handler, method, status) -> Anzahl
+    'request_seconds': {},  # (handler, method) -> Histogram
+    'inference_seconds': {},  # step -> Histogram
+    'training_phase_seconds': {},  # phase -> Histogram (Summe je Training)
+    'training_phase_last': {},     # phase -> Sekunden im letzten/laufenden Training
+    'training_phase_total': {},    # phase -> Sekunden ueber alle Trainings
+    # nur mit TRAINING_PROFILE: phase -> Wandzeit/CPU/Speicher des laufenden bzw. letzten Trainings
+    'profile_current': {},
+    'profile_run': None,
+    'profile_history': deque(maxlen=max(TRAINING_PROFILE_HISTORY, 1))
+}
+# tracemalloc laeuft nur, solange mindestens eine Phase misst
+_profile_lock = threading.Lock()
+_profile_active = 0
+
+
+def observe_inference(step: str, seconds: float) -> None:
+    with _metrics_lock:
+        histogram = _metrics['inference_seconds'].get(step)
+        if histogram is None:
+            histogram = _metrics['inference_seconds'][step] = Histogram()
+        histogram.observe(seconds)
+
+
+def record_request(handler: str, method: str, status: int, seconds: float) -> None:
+    with _metrics_lock:
+        key = (handler, method, status)
+        _metrics['requests'][key] = _metrics['requests'].get(key, 0) + 1
+        histogram = _metrics['request_seconds'].get((handler, method))
+        if histogram is None:
+            histogram = _metrics['request_seconds'][(handler, method)] = Histogram()
+        histogram.observe(seconds)
+
+
+def begin_training_phases() -> None:
+    with _metrics_lock:
+        _metrics['training_phase_last'] = {}
+        _metrics['profile_current'] = {}
+
+
+def _observe_training_phase(phase: str, seconds: float) -> None:
+    histogram = _metrics['training_phase_seconds'].get(phase)
+    if histogram is None:
+        histogram = _metrics['training_phase_seconds'][phase] = Histogram(TRAINING_BUCKETS)
+    histogram.observe(seconds)
+
+
+def record_training_phase(phase: str, seconds: float, cpu_seconds: Optional[float] = None,
+                          peak_bytes: Optional[int] = None) -> None:
+    """Addiert die Dauer einer Trainingsphase (z.B. mehrere Abrufseiten) zum laufenden Training."""
+    with _metrics_lock:
+        last = _metrics['training_phase_last']
+        last[phase] = last.get(phase, 0.0) + seconds
+        totals = _metrics['training_phase_total']
+        totals[phase] = totals.get(phase, 0.0) + seconds
+        if phase in BACKGROUND_TRAINING_PHASES:
+            _observe_training_phase(phase, seconds)
+        if cpu_seconds is None:
+            return
+        # Speichern/Backup laufen nach dem Training und gehoeren zu dessen Eintrag
+        if phase in BACKGROUND_TRAINING_PHASES:
+            run = _metrics['profile_run']
+            profile = run['phases'] if run is not None else None
+        else:
+            profile = _metrics['profile_current']
+        if profile is not None:
+            _add_phase_profile(profile, phase, seconds, cpu_seconds, peak_bytes or 0)
+
+
+def end_training_phases(started_at: float, duration: float, ok: bool) -> None:
+    with _metrics_lock:
+        for phase, seconds in _metrics['training_phase_last'].items():
+            if phase not in BACKGROUND_TRAINING_PHASES:
+                _observe_training_phase(phase, seconds)
+        if not TRAINING_PROFILE:
+            return
+        snapshot = _model_snapshot
+        run = {
+            'started_at': int(started_at),
+            'duration_seconds': round(duration, 4),
+            'ok': ok,
+            'model_mode': snapshot.model_mode,
+            'samples': snapshot.samples,
+            'tasks': len(snapshot.task_texts or ()),
+            'phases': _metrics['profile_current']
+        }
+        _metrics['profile_current'] = {}
+        _metrics['profile_run'] = run
+        _metrics['profile_history'].append(run)
+
+
+def _add_phase_profile(profile: dict, phase: str, seconds: float, cpu_seconds: float, peak_bytes: int) -> None:
+    entry = profile.get(phase)
+    if entry is None:
+        entry = profile[phase] = {'seconds': 0.0, 'cpu_seconds': 0.0, 'peak_bytes': 0}
+    entry['seconds'] += seconds
+    entry['cpu_seconds'] += cpu_seconds
+    entry['peak_bytes'] = max(entry['peak_bytes'], peak_bytes)
+
+
+def _start_tracing() -> None:
+    global _profile_active
+    with _profile_lock:
+        if _profile_active == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _profile_active += 1
+        tracemalloc.reset_peak()
+
+
+def _stop_tracing() -> int:
+    global _profile_active
+    with _profile_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _profile_active -= 1
+        if _profile_active == 0:
+            tracemalloc.stop()
+        return peak
+
+
+@contextmanager
+def measure_phase(phase: str, into: dict, profile: bool = False):
+    """
+    Summiert die Wandzeit einer Phase in into[phase], mit profile zusaetzlich
+    CPU-Zeit und die hoechste per tracemalloc gezaehlte Allokation (Python und
+    numpy). Im Trainingsprozess zaehlt die CPU-Zeit aller Threads (BLAS), im
+    Dienst nur die des aufrufenden Threads. Laeuft eine zweite Phase parallel,
+    ist die Speicherspitze nur eine Naeherung.
+    """
+    cpu_clock = time.process_time if multiprocessing.parent_process() is not None else time.thread_time
+    if profile:
+        _start_tracing()
+        cpu_start = cpu_clock()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if profile:
+            _add_phase_profile(into, phase, seconds, cpu_clock() - cpu_start, _stop_tracing())
+        else:
+            entry = into.setdefault(phase, {'seconds': 0.0})
+            entry['seconds'] += seconds
+
+
+@contextmanager
+def training_phase(phase: str):
+    measured = {}
+    try:
+        with measure_phase(phase, measured, TRAINING_PROFILE):
+            yield
+    finally:
+        record_training_phase(phase, **measured[phase])
+
+
+def training_profile_stats() -> dict:
+    with _metrics_lock:
+        history = [{**run, 'phases': {phase: dict(entry) for phase, entry in run['phases'].items()}}
+                   for run in _metrics['profile_history']]
+    return {'enabled': TRAINING_PROFILE, 'history': history}
+
+
+def set_backend_url(url: str, share: bool = True) -> None:
     global BACKEND_URL
     if not url:
         return
     normalized = url.rstrip('/')
     with _backend_lock:
-        if BACKEND_URL and BACKEND_URL != normalized:
+        changed = bool(BACKEND_URL) and BACKEND_URL != normalized
+        if changed:
             logging.info('Backend-URL aktualisiert: %s -> %s', BACKEND_URL, normalized)
         elif not BACKEND_URL:
             logging.info('Backend-URL automatisch erkannt: %s', normalized)
+        is_new = BACKEND_URL != normalized
         BACKEND_URL = normalized
+    if changed:
+        # Gepoolte Verbindungen zum alten Backend verwerfen
+        reset_http_session()
+        with _model_lock:
+            _model_state['ingest_unpaged'] = False
+    if is_new and share:
+        write_control(backend_url=normalized)
 
 
 def detect_backend_from_request(request: Request) -> None:
-    """Extrahiert die Backend-URL aus einer eingehenden HTTP-Anfrage."""
+    """
+    Startet die Erkennung der Backend-URL anhand einer eingehenden Anfrage im
+    Hintergrund; der Request wartet nicht darauf. Pro Client-Host laeuft
+    hoechstens eine Pruefung, erfolglose Hosts werden fuer
+    BACKEND_PROBE_RETRY_SECONDS nicht erneut geprueft.
+    """
     if get_backend_url():
         return  # Backend-URL bereits gesetzt
     
     client_host = request.client.host if request.client else None
     if not client_host or client_host in ['127.0.0.1', 'localhost', '::1']:
         return  # Lokale Anfragen ignorieren
-    
+
+    now = time.time()
+    with _backend_probe_lock:
+        if client_host in _backend_probes_running:
+            return
+        failed_at = _backend_probe_failures.get(client_host)
+        if failed_at is not None and now - failed_at < BACKEND_PROBE_RETRY_SECONDS:
+            return
+        _backend_probes_running.add(client_host)
+
+    thread = threading.Thread(target=_probe_backend_host, args=(client_host,), daemon=True)
+    thread.start()
+
+
+def _probe_backend_host(client_host: str) -> None:
+    found = False
+    try:
+        found = probe_backend_host(client_host)
+    finally:
+        with _backend_probe_lock:
+            _backend_probes_running.discard(client_host)
+            _backend_probe_failures.pop(client_host, None)
+            if not found:
+                now = time.time()
+                _backend_probe_failures[client_host] = now
+                # Abgelaufene Eintraege entfernen, sonst waechst die Tabelle mit jeder DHCP-Adresse
+                for host, failed_at in list(_backend_probe_failures.items()):
+                    if now - failed_at < BACKEND_PROBE_RETRY_SECONDS:
+                        break
+                    del _backend_probe_failures[host]
+
+
+def probe_backend_host(client_host: str) -> bool:
+    """Prueft, ob auf dem Client-Host ein Backend laeuft, und uebernimmt dessen URL."""
+    if get_backend_url():
+        return True
+
     # Methode 1: Server-Info API abfragen (bevorzugt)
     backend_url_candidate = f'http://{client_host}:3001'
     try:
-        response = requests.get(f'{backend_url_candidate}/api/server-info', timeout=2)
+        response = http_get('server-info', f'{backend_url_candidate}/api/server-info', timeout=2)
         if response.status_code == 200:
             data = response.json()
             # Nutze die vom Server bereitgestellte API-URL
@@ -178,18 +1304,20 @@ def detect_backend_from_request(request: Request) -> None:
                 backend_url = api_url.replace('/api', '')
                 set_backend_url(backend_url)
                 logging.info('Backend-URL via server-info API erkannt: %s', backend_url)
-                return
+                return True
     except Exception as e:
         logging.debug('server-info API nicht erreichbar: %s', e)
     
     # Methode 2: Fallback mit Health-Check
     try:
-        response = requests.get(f'{backend_url_candidate}/api/health', timeout=2)
+        response = http_get('health', f'{backend_url_candidate}/api/health', timeout=2)
         if response.status_code == 200:
             set_backend_url(backend_url_candidate)
             logging.info('Backend-URL via health-check erkannt: %s', backend_url_candidate)
+            return True
     except Exception:
         pass  # Ignorieren wenn Validierung fehlschlägt
+    return False
 
 
 def get_backend_url() -> str:
@@ -197,68 +1325,421 @@ def get_backend_url() -> str:
         return BACKEND_URL
 
 
-def load_model_from_disk() -> None:
-    if not os.path.isfile(MODEL_PATH):
-        return
+def load_model_from_disk() -> bool:
     try:
-        state = joblib.load(MODEL_PATH)
-        if not isinstance(state, dict):
-            return
+        if os.path.isfile(MODEL_MANIFEST):
+            state = _load_model_dir()
+        elif os.path.isfile(MODEL_PATH):
+            state = _load_model_legacy()
+        else:
+            return False
+        if not state:
+            return False
+        if state.get('regressor') is not None and state.get('task_matrix') is not None and (
+            'task_index' not in state or state.get('task_keyword_version') != _keyword_engine.version
+        ):
+            # Aeltere Version oder geaenderte Schluesselwort-Tabellen: Task-Tabelle nachberechnen
+            state.update(build_task_table(state['regressor'], state['task_matrix'], state.get('task_texts') or [], state))
         with _model_lock:
-            _model_state.update(state)
-        logging.info('Modell geladen (%s Samples)', _model_state.get('samples', 0))
+            _model_state.update({key: value for key, value in state.items() if key not in ModelSnapshot.__slots__})
+        snapshot = publish_model(state)
+        logging.info('Modell geladen (%s Samples)', snapshot.samples)
+        return True
     except Exception as err:
         logging.warning('Modell konnte nicht geladen werden: %s', err)
+        return False
+
+
+def _load_model_dir() -> dict:
+    """
+    Laedt Modell und Task-Tabelle; numpy-Arrays (Koeffizienten, IDF, CSR-Arrays)
+    werden nur per mmap eingeblendet. Der Training-Cache bleibt auf der Platte,
+    bis das erste Training ihn braucht (ensure_training_state).
+    """
+    with open(MODEL_MANIFEST, encoding='utf-8') as handle:
+        manifest = json.load(handle)
+    if manifest.get('format') != MODEL_FORMAT:
+        logging.warning('Unbekanntes Modellformat: %s', manifest.get('format'))
+        return {}
+    files = manifest.get('files', MODEL_FILES)
+    state = joblib.load(os.path.join(MODEL_DIR, files['model']), mmap_mode='r')
+    tasks = joblib.load(os.path.join(MODEL_DIR, files['tasks']), mmap_mode='r')
+    generation = manifest.get('generation')
+    if state.pop('generation', None) != generation or tasks.pop('generation', None) != generation:
+        # nur bei Dateien frueherer Versionen mit festen Namen, die gerade ersetzt wurden
+        logging.info('Modelldateien passen nicht zum Manifest - Laden verschoben')
+        return {}
+    state.update(tasks)
+    state['last_id'] = manifest.get('last_id', 0)
+    state['cache_size'] = manifest.get('cache_size', 0)
+    state['training_cache'] = None
+    state['training_state_loaded'] = False
+    # training.joblib derselben Generation, auch wenn inzwischen ein neueres Manifest vorliegt
+    state['model_files'] = files
+    return state
+
+
+def _load_model_legacy() -> dict:
+    state = joblib.load(MODEL_PATH)
+    if not isinstance(state, dict):
+        return {}
+    if isinstance(state.get('training_cache'), dict):
+        # Altes Format: dict pro Termin -> spaltenorientierter Cache
+        state['training_cache'] = TrainingCache.from_entries(state['training_cache'].values())
+    state['training_state_loaded'] = True
+    return state
+
+
+def ensure_training_state() -> None:
+    """
+    Laedt Training-Cache, FeatureCache und last_id aus training.joblib, falls
+    das noch nicht geschehen ist. last_id wird nur zusammen mit dem Cache
+    uebernommen, sonst beginnt der Abruf von vorne.
+    """
+    with _model_lock:
+        if _model_state.get('training_state_loaded'):
+            return
+        files = _model_state.get('model_files')
+    if files is None:
+        # Modell nicht geladen (fehlt oder unlesbar): Training-Cache des geltenden Manifests
+        files = (read_manifest() or {}).get('files', MODEL_FILES)
+    path = os.path.join(MODEL_DIR, files['training'])
+    state = {'training_cache': None, 'feature_cache': None, 'last_id': 0}
+    if os.path.isfile(path):
+        try:
+            loaded = joblib.load(path)
+            state.update({key: loaded.get(key) for key in TRAINING_KEYS})
+            logging.info('Training-Cache geladen (%s Eintraege)', len(state['training_cache'] or ()))
+        except Exception as err:
+            logging.warning('Training-Cache konnte nicht geladen werden: %s', err)
+    with _model_lock:
+        _model_state.update(state)
+        _model_state['training_state_loaded'] = True
+
+
+class _HashingWriter:
+    """Dateiobjekt fuer joblib.dump, das beim Schreiben den Inhalts-Hash mitrechnet."""
+
+    def __init__(self, handle) -> None:
+        self.handle = handle
+        self.digest = hashlib.blake2b(digest_size=20)
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        return self.handle.write(data)
+
+    def tell(self) -> int:
+        return self.handle.tell()
+
+
+def _fsync_dir(path: str) -> None:
+    # Umbenennungen erst nach fsync des Verzeichnisses absturzsicher (nicht unter Windows)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _dump_atomic(payload, path: str) -> str:
+    """
+    Schreibt nach path.tmp, fsync, dann os.replace: nach einem Absturz liegt
+    entweder die alte oder die neue Datei vor. Liefert den Inhalts-Hash.
+    """
+    with open(path + '.tmp', 'wb') as handle:
+        writer = _HashingWriter(handle)
+        joblib.dump(payload, writer)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(path + '.tmp', path)
+    return writer.digest.hexdigest()
+
+
+def _write_json_atomic(payload, path: str) -> None:
+    with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(payload, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest() -> Optional[dict]:
+    try:
+        with open(MODEL_MANIFEST, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _generation_files(generation: int) -> dict:
+    """Dateinamen eines Stands: ein neuer Stand ueberschreibt nie die geltenden Dateien."""
+    return {key: f'{key}-{generation}.joblib' for key in MODEL_FILES}
+
+
+def cleanup_model_files(keep: set) -> None:
+    """Entfernt Modelldateien und Reste abgebrochener Speichervorgaenge ausser keep."""
+    for filename in os.listdir(MODEL_DIR):
+        if filename == os.path.basename(MODEL_MANIFEST) or filename in keep:
+            continue
+        try:
+            os.remove(os.path.join(MODEL_DIR, filename))
+        except OSError as err:
+            # Windows: noch per mmap eingeblendet, beim naechsten Speichern erneut
+            logging.debug('Modelldatei konnte nicht entfernt werden: %s', err)
+
+
+def _mappable_model(state: dict) -> tuple:
+    """
+    Modell- und Task-Teil fuer die Platte: Listen und das Vokabular werden zu
+    numpy-basierten Strukturen, die beim Laden nur per mmap eingeblendet werden.
+    """
+    model_part = {key: state.get(key) for key in MODEL_KEYS if key not in TASK_KEYS}
+    model_part['trained_at'] = state.get('trained_at', 0)
+    model_part['samples'] = state.get('samples', 0)
+    vectorizer = model_part.get('vectorizer')
+    if isinstance(getattr(vectorizer, 'vocabulary_', None), dict):
+        vectorizer = copy.copy(vectorizer)
+        vectorizer.vocabulary_ = TermIndex.from_dict(vectorizer.vocabulary_)
+        model_part['vectorizer'] = vectorizer
+
+    tasks_part = {key: state.get(key) for key in TASK_KEYS}
+    for key, separator in (('task_texts', None), ('task_kategorien', None), ('task_teile', '\x1f')):
+        if tasks_part.get(key) is not None and not isinstance(tasks_part[key], TextColumn):
+            tasks_part[key] = TextColumn.from_list(tasks_part[key], separator)
+    return model_part, tasks_part
 
 
 def save_model_to_disk(state: dict) -> None:
     ensure_data_dir()
+    with _persist_lock:
+        _save_model_files(state)
+    refresh_storage_stats()
+
+
+def _save_model_files(state: dict) -> None:
     try:
-        joblib.dump(state, MODEL_PATH)
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        model_part, tasks_part = _mappable_model(state)
+        # Gleiche Generation in allen Dateien und im Manifest
+        generation = time.time_ns()
+        model_part['generation'] = tasks_part['generation'] = generation
+        parts = {
+            'model': model_part,
+            'tasks': tasks_part,
+            'training': {key: state.get(key) for key in TRAINING_KEYS}
+        }
+        previous = read_manifest() or {}
+        files = _generation_files(generation)
+        with training_phase('save'):
+            hashes = {key: _dump_atomic(part, os.path.join(MODEL_DIR, files[key])) for key, part in parts.items()}
+        _fsync_dir(MODEL_DIR)
+        manifest = {
+            'format': MODEL_FORMAT,
+            'generation': generation,
+            'trained_at': state.get('trained_at', 0),
+            'samples': state.get('samples', 0),
+            'last_id': state.get('last_id', 0),
+            'cache_size': len(state.get('training_cache') or ()),
+            'files': files,
+            'hashes': hashes
+        }
+        # Einziger Schritt, der den geltenden Stand wechselt: bricht das Speichern
+        # vorher ab, verweist das alte Manifest weiter auf vollstaendige Dateien
+        _write_json_atomic(manifest, MODEL_MANIFEST)
+        _fsync_dir(MODEL_DIR)
+        # eigener Stand: nicht erneut aus dem Manifest laden
+        _worker_state['manifest_token'] = _file_token(MODEL_MANIFEST)
+        if os.path.isfile(MODEL_PATH):
+            os.remove(MODEL_PATH)
+        # Vorgaenger behalten, bis andere Worker nachgeladen haben
+        cleanup_model_files(set(files.values()) | set(previous.get('files', {}).values()))
         # Automatisches Backup nach jedem Training
-        backup_model()
+        with training_phase('backup'):
+            _backup_model_files()
     except Exception as err:
         logging.warning('Modell konnte nicht gespeichert werden: %s', err)
         with _model_lock:
             _model_state['last_error'] = f'Save failed: {err}'
 
+
+def schedule_model_save(state: dict) -> None:
+    """
+    Speichert den Modellstand im Hintergrund, damit Training und Requests
+    nicht auf fsync und Backup warten. Wartet bereits ein Stand, wird er
+    durch den neueren ersetzt.
+    """
+    with _save_condition:
+        _save_queue['state'] = state
+        if _save_queue['running']:
+            return
+        _save_queue['running'] = True
+    threading.Thread(target=_save_worker, daemon=True).start()
+
+
+def _save_worker() -> None:
+    while True:
+        with _save_condition:
+            state = _save_queue['state']
+            _save_queue['state'] = None
+            if state is None:
+                _save_queue['running'] = False
+                _save_condition.notify_all()
+                return
+        try:
+            save_model_to_disk(state)
+        except Exception as err:
+            logging.warning('Modell konnte nicht gespeichert werden: %s', err)
+
+
+def flush_model_save(timeout: Optional[float] = None) -> bool:
+    """Wartet, bis ein laufendes Speichern abgeschlossen ist."""
+    with _save_condition:
+        return _save_condition.wait_for(lambda: not _save_queue['running'], timeout)
+
+
+def model_files_exist() -> bool:
+    return os.path.isfile(MODEL_MANIFEST) or os.path.isfile(MODEL_PATH)
+
+
+def refresh_storage_stats() -> None:
+    """
+    Aktualisiert Modellgroesse und Backup-Anzahl nach Schreibvorgaengen, damit
+    /health und /api/stats ohne Dateisystemzugriff auskommen.
+    """
+    exists = model_files_exist()
+    manifest = read_manifest()
+    if manifest is not None:
+        paths = [os.path.join(MODEL_DIR, name) for name in manifest.get('files', MODEL_FILES).values()]
+        size = sum(os.path.getsize(path) for path in paths if os.path.isfile(path))
+    else:
+        size = os.path.getsize(MODEL_PATH) if exists else 0
+    count = len(list_backups())
+    with _model_lock:
+        _model_state['model_exists'] = exists
+        _model_state['model_size_bytes'] = size
+        _model_state['backup_count'] = count
+
+
+def read_backup_index() -> list:
+    try:
+        with open(BACKUP_INDEX, encoding='utf-8') as handle:
+            return json.load(handle).get('backups', [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+
+def list_backups() -> list:
+    """
+    Alle Backups, neueste zuerst: Eintraege aus index.json plus Backups im
+    alten Format (model_<ts>.joblib bzw. Verzeichnis model_<ts>). Das Alter
+    steht im Namen, es wird kein stat je Datei gebraucht.
+    """
+    backups = [(entry.get('created_at', 0), entry['id'], entry) for entry in read_backup_index()]
+    if os.path.isdir(MODEL_BACKUP_DIR):
+        for name in os.listdir(MODEL_BACKUP_DIR):
+            stem = name[len('model_'):].split('.', 1)[0]
+            if name.startswith('model_') and stem.isdigit():
+                backups.append((int(stem), name, None))
+    backups.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return backups
+
+
+def _store_backup_object(path: str, digest: str) -> None:
+    """Legt die Datei unter ihrem Hash ab: harter Link, sonst Kopie; vorhandene bleiben."""
+    target = os.path.join(BACKUP_OBJECTS_DIR, f'{digest}.joblib')
+    if os.path.isfile(target):
+        return
+    # Live-Dateien werden nur per os.replace ersetzt, ein Link bleibt daher unveraendert
+    try:
+        os.link(path, target + '.tmp')
+    except OSError:
+        import shutil
+        shutil.copy2(path, target + '.tmp')
+    os.replace(target + '.tmp', target)
+
+
 def backup_model() -> None:
     """Erstellt ein timestamped Backup des aktuellen Modells"""
-    if not os.path.isfile(MODEL_PATH):
+    with _persist_lock:
+        _backup_model_files()
+    refresh_storage_stats()
+
+
+def _backup_model_files() -> None:
+    if not model_files_exist():
         return
     try:
         timestamp = int(time.time())
-        backup_path = os.path.join(MODEL_BACKUP_DIR, f'model_{timestamp}.joblib')
-        import shutil
-        shutil.copy2(MODEL_PATH, backup_path)
-        
+        os.makedirs(BACKUP_OBJECTS_DIR, exist_ok=True)
+        manifest = read_manifest()
+        if manifest is not None:
+            hashes = dict(manifest.get('hashes') or {})
+            for key, filename in manifest.get('files', MODEL_FILES).items():
+                path = os.path.join(MODEL_DIR, filename)
+                hashes[key] = hashes.get(key) or _file_digest(path)
+                _store_backup_object(path, hashes[key])
+            manifest['hashes'] = hashes
+        else:
+            digest = _file_digest(MODEL_PATH)
+            _store_backup_object(MODEL_PATH, digest)
+            manifest = {'format': 1, 'files': {'model': os.path.basename(MODEL_PATH)}, 'hashes': {'model': digest}}
+        _fsync_dir(BACKUP_OBJECTS_DIR)
+
+        backup_id = f'model_{timestamp}'
+        index = [entry for entry in read_backup_index() if entry.get('id') != backup_id]
+        index.append({'id': backup_id, 'created_at': timestamp, 'manifest': manifest})
+        _write_json_atomic({'backups': index}, BACKUP_INDEX)
+
         with _model_lock:
             _model_state['last_backup_at'] = timestamp
-        
+
         # Lösche alte Backups (behalte nur die letzten 5)
         cleanup_old_backups()
-        logging.info('Model-Backup erstellt: %s', backup_path)
+        logging.info('Model-Backup erstellt: %s', backup_id)
     except Exception as err:
         logging.warning('Backup fehlgeschlagen: %s', err)
 
-def cleanup_old_backups(keep_count: int = 5) -> None:
-    """Behält nur die neuesten N Backups"""
+
+def cleanup_old_backups(keep_count: int = BACKUP_KEEP_COUNT) -> None:
+    """Behält nur die neuesten N Backups und entfernt nicht mehr referenzierte Dateien"""
     try:
-        backups = []
-        for f in os.listdir(MODEL_BACKUP_DIR):
-            if f.startswith('model_') and f.endswith('.joblib'):
-                path = os.path.join(MODEL_BACKUP_DIR, f)
-                backups.append((os.path.getmtime(path), path))
-        
-        backups.sort(reverse=True)
-        for _, path in backups[keep_count:]:
-            os.remove(path)
-            logging.info('Altes Backup gelöscht: %s', path)
+        import shutil
+        backups = list_backups()
+        for _, name, entry in backups[keep_count:]:
+            if entry is None:
+                path = os.path.join(MODEL_BACKUP_DIR, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            logging.info('Altes Backup gelöscht: %s', name)
+
+        kept = [entry for _, _, entry in backups[:keep_count] if entry is not None]
+        if len(kept) != len(read_backup_index()):
+            _write_json_atomic({'backups': sorted(kept, key=lambda entry: entry.get('created_at', 0))}, BACKUP_INDEX)
+        referenced = {f'{digest}.joblib' for entry in kept for digest in entry['manifest'].get('hashes', {}).values()}
+        if os.path.isdir(BACKUP_OBJECTS_DIR):
+            for name in os.listdir(BACKUP_OBJECTS_DIR):
+                if name not in referenced:
+                    os.remove(os.path.join(BACKUP_OBJECTS_DIR, name))
     except Exception as err:
         logging.warning('Cleanup alter Backups fehlgeschlagen: %s', err)
 
 
-def fetch_training_data_with_retry(since_id: int) -> Optional[tuple]:
+def fetch_training_page_with_retry(since_id: int, max_id: int = 0, limit: int = 0) -> Optional[tuple]:
     delay = TRAINING_BACKOFF_INITIAL_SECONDS
     for attempt in range(1, TRAINING_MAX_RETRIES + 1):
         try:
@@ -267,19 +1748,25 @@ def fetch_training_data_with_retry(since_id: int) -> Optional[tuple]:
                 logging.info('BACKEND_URL nicht gesetzt - warte auf Auto-Discovery.')
                 return None
             params = {}
-            if TRAINING_LIMIT <= 0:
+            if limit <= 0:
                 params['limit'] = 'all'
             else:
-                params['limit'] = TRAINING_LIMIT
+                params['limit'] = limit
             if TRAINING_LOOKBACK_DAYS > 0:
                 params['lookback_days'] = TRAINING_LOOKBACK_DAYS
             if since_id > 0:
                 params['since_id'] = since_id
+            if max_id > 0:
+                params['max_id'] = max_id
 
             url = f'{backend_url}/api/ai/training-data'
-            response = requests.get(url, params=params, timeout=BACKEND_TIMEOUT_SECONDS)
-            response.raise_for_status()
-            payload = response.json()
+            with training_phase('fetch'):
+                response = http_get('training-data', url, params=params, timeout=BACKEND_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                # requests liest den Body erst hier, das gehoert noch zum Abruf
+                body = response.content
+            with training_phase('parse'):
+                payload = json.loads(body)
             data = payload.get('data', {})
             return data.get('termine', []), data.get('meta', {})
         except Exception as err:
@@ -291,126 +1778,709 @@ def fetch_training_data_with_retry(since_id: int) -> Optional[tuple]:
             delay = min(delay * 2, TRAINING_BACKOFF_MAX_SECONDS)
 
 
+def training_db_available() -> bool:
+    return bool(TRAINING_DB_PATH) and os.path.isfile(TRAINING_DB_PATH)
+
+
+def open_training_db() -> sqlite3.Connection:
+    """Oeffnet werkstatt.db nur lesend; im WAL-Modus blockiert das den Backend-Writer nicht."""
+    uri = 'file:' + pathname2url(os.path.abspath(TRAINING_DB_PATH)) + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=BACKEND_TIMEOUT_SECONDS, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA query_only = 1')
+    return conn
+
+
+def fetch_training_page_from_db(since_id: int, max_id: int = 0, limit: int = 0) -> Optional[tuple]:
+    """
+    Liest eine Seite Trainingsdaten direkt aus der Datenbank. Filter, Sortierung
+    und Rueckgabeformat entsprechen GET /api/ai/training-data.
+    """
+    conditions = []
+    params = []
+    if since_id > 0:
+        conditions.append('t.id > ?')
+        params.append(since_id)
+    if TRAINING_LOOKBACK_DAYS > 0:
+        conditions.append("t.datum >= date('now', ?)")
+        params.append(f'-{TRAINING_LOOKBACK_DAYS} day')
+    delta_clause = f"AND ({' OR '.join(conditions)})" if conditions else ''
+    page_clause = ''
+    if max_id > 0:
+        page_clause = 'AND t.id <= ?'
+        params.append(max_id)
+    limit_clause = ''
+    if limit > 0:
+        limit_clause = 'LIMIT ?'
+        params.append(limit)
+
+    base_filter = (
+        't.geloescht_am IS NULL AND t.arbeit IS NOT NULL '
+        'AND t.tatsaechliche_zeit IS NOT NULL AND t.tatsaechliche_zeit > 0'
+    )
+    try:
+        conn = open_training_db()
+        try:
+            with training_phase('fetch'):
+                rows = conn.execute(f'''
+                    SELECT t.id, t.arbeit, t.tatsaechliche_zeit, t.status, t.datum, t.ki_training_exclude
+                    FROM termine t
+                    WHERE {base_filter}
+                    {delta_clause}
+                    {page_clause}
+                    ORDER BY t.id DESC
+                    {limit_clause}
+                ''', params).fetchall()
+                max_row = conn.execute(f'SELECT MAX(t.id) FROM termine t WHERE {base_filter}').fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as err:
+        logging.warning('Trainingsdaten aus Datenbank nicht lesbar: %s', err)
+        return None
+
+    with training_phase('parse'):
+        termine = [dict(row) for row in rows]
+    return termine, {'max_id': (max_row[0] if max_row else 0) or 0}
+
+
+def fetch_training_page(since_id: int, max_id: int = 0, limit: int = 0) -> Optional[tuple]:
+    """Lokale Datenbank bevorzugen, sonst (Remote-Installation) ueber das Backend."""
+    if training_db_available():
+        result = fetch_training_page_from_db(since_id, max_id, limit)
+        if result is not None:
+            return result
+        if not get_backend_url():
+            return None
+        logging.info('Falle auf Backend-API fuer Trainingsdaten zurueck.')
+    return fetch_training_page_with_retry(since_id, max_id, limit)
+
+
+def apply_training_row(cache: TrainingCache, termin: dict, features: Optional[FeatureCache] = None) -> Optional[str]:
+    """
+    Uebernimmt einen Termin in den Training-Cache.
+    Liefert 'added', 'changed', 'removed' oder None (keine Aenderung).
+    """
+    try:
+        tid = int(termin.get('id'))
+    except (TypeError, ValueError):
+        return None
+
+    minutes = None
+    arbeit = termin.get('arbeit')
+    zeit = termin.get('tatsaechliche_zeit')
+    if (
+        not termin.get('ki_training_exclude')
+        and termin.get('status') == 'abgeschlossen'
+        and arbeit
+        and zeit is not None
+    ):
+        try:
+            minutes = float(zeit)
+        except (TypeError, ValueError):
+            minutes = None
+
+    if minutes is None or minutes <= 0:
+        return 'removed' if cache.remove(tid) else None
+
+    text = features.normalize(arbeit) if features is not None else normalize_text(arbeit)
+    return cache.upsert(tid, termin.get('datum'), text, minutes)
+
+
+def ingest_training_data(cache: TrainingCache, since_id: int, features: Optional[FeatureCache] = None) -> Optional[tuple]:
+    """
+    Laedt Trainingsdaten seitenweise (neueste zuerst) per Keyset-Cursor und
+    uebernimmt jede Seite sofort in den Cache. Bricht ein Abruf endgueltig ab,
+    setzt der naechste Zyklus desselben Prozesses beim Cursor fort; nach einem
+    Neustart beginnt der Abruf wieder ab dem gespeicherten last_id. Ignoriert
+    das Backend max_id (aeltere Version), wird wie frueher alles in einem
+    Abruf geladen.
+
+    Liefert (added_ids, dirty, max_id) oder None, wenn der Abruf unvollstaendig
+    ist. dirty ist True, wenn Eintraege geaendert oder entfernt wurden oder der
+    Abruf fortgesetzt wurde - dann reicht ein inkrementelles Update nicht aus.
+    """
+    with _model_lock:
+        cursor = int(_model_state.get('ingest_cursor', 0) or 0)
+        target_id = int(_model_state.get('ingest_target_id', 0) or 0)
+        unpaged = bool(_model_state.get('ingest_unpaged'))
+
+    if cursor:
+        logging.info('Setze Trainingsdaten-Abruf bei ID %s fort.', cursor)
+    # Bei Fortsetzung wurden frueher bereits Seiten uebernommen
+    dirty = cursor > 0
+    added_ids = set()
+    fetched = 0
+
+    while True:
+        limit = 0 if unpaged else max(TRAINING_PAGE_SIZE, 0)
+        if TRAINING_LIMIT > 0:
+            remaining = TRAINING_LIMIT - fetched
+            limit = min(limit, remaining) if limit else remaining
+
+        result = fetch_training_page(since_id, cursor, limit)
+        if result is None:
+            return None
+
+        termine, meta = result
+        if not target_id and isinstance(meta, dict) and meta.get('max_id'):
+            target_id = int(meta.get('max_id'))
+
+        page_ids = []
+        for termin in termine:
+            try:
+                page_ids.append(int(termin.get('id')))
+            except (TypeError, ValueError):
+                continue
+
+        # Backend ohne max_id-Unterstuetzung liefert dieselbe Seite erneut:
+        # fuer dieses Backend ohne Seiten weiter, sonst fehlten alle aelteren Termine
+        if cursor > 0 and page_ids and min(page_ids) > cursor:
+            logging.info('Backend ignoriert max_id - lade Trainingsdaten in einem Abruf.')
+            unpaged = True
+            cursor = 0
+            fetched = 0
+            with _model_lock:
+                _model_state['ingest_unpaged'] = True
+            continue
+
+        with training_phase('cache'):
+            for termin in termine:
+                change = apply_training_row(cache, termin, features)
+                if change == 'added':
+                    added_ids.add(int(termin.get('id')))
+                elif change:
+                    dirty = True
+        fetched += len(termine)
+
+        done = (
+            not page_ids
+            or limit <= 0
+            or len(termine) < limit
+            or (TRAINING_LIMIT > 0 and fetched >= TRAINING_LIMIT)
+            or min(page_ids) <= 1
+        )
+        cursor = 0 if done else min(page_ids) - 1
+
+        with _model_lock:
+            _model_state['training_cache'] = cache
+            _model_state['ingest_cursor'] = cursor
+            _model_state['ingest_target_id'] = 0 if done else target_id
+
+        if done:
+            return added_ids, dirty, target_id
+
+
 def _train_model_internal() -> None:
-    if not get_backend_url():
+    if not get_backend_url() and not training_db_available():
         if BACKEND_DISCOVERY_ENABLED:
             start_backend_discovery()
         logging.info('BACKEND_URL nicht gesetzt - Training uebersprungen.')
         return
 
+    ensure_training_state()
+    # Training-Cache erst veraendern, wenn der vorige Stand gespeichert ist
+    flush_model_save()
     with _model_lock:
         cache = _model_state.get('training_cache')
-        if cache is None or not isinstance(cache, dict):
-            cache = {}
+        if not isinstance(cache, TrainingCache):
+            cache = TrainingCache()
+        features = _model_state.get('feature_cache')
+        if not isinstance(features, FeatureCache):
+            features = FeatureCache()
+            _model_state['feature_cache'] = features
         last_id = int(_model_state.get('last_id', 0) or 0)
 
-    result = fetch_training_data_with_retry(last_id)
+    # Stand vor dem Abruf merken: Aenderungen waehrend des Trainings loesen erneut aus
+    mark = probe_training_watermark()
+    with _model_lock:
+        previous_mark = _model_state.get('watermark')
+    result = ingest_training_data(cache, last_id, features)
     if result is None:
         return
+    added_ids, dirty, max_id = result
+    if (
+        not added_ids and not dirty and last_id and TRAINING_LOOKBACK_DAYS <= 0
+        and mark is not None and previous_mark is not None and mark != previous_mark
+    ):
+        # Ohne Lookback-Fenster sieht der Delta-Abruf nur neue IDs; die Aenderung
+        # betrifft also aeltere Termine und ist nur mit einem Komplettabruf sichtbar
+        logging.info('Aenderung an aelteren Trainingsdaten - lade alle Termine neu.')
+        result = ingest_training_data(cache, 0, features)
+        if result is None:
+            return
+        added_ids, dirty, max_id = result
+
+    with _model_lock:
+        _model_state['watermark'] = mark
+    if max_id:
+        last_id = int(max_id)
+
+    if not cache:
+        logging.info('Keine Trainingsdaten vorhanden.')
+        with _model_lock:
+            _model_state['training_cache'] = cache
+            _model_state['last_id'] = last_id
+        return
+
+    # Kein veroeffentlichtes Modell (z.B. Modelldateien unlesbar): aus dem Cache neu aufbauen
+    rebuild = not _model_snapshot.ready
+    if not added_ids and not dirty and not rebuild:
+        with _model_lock:
+            _model_state['last_id'] = last_id
+        logging.info('Keine neuen Trainingsdaten.')
+        return
+
+    if len(cache) < 3:
+        logging.info('Zu wenig Trainingsdaten (%s).', len(cache))
+        with _model_lock:
+            _model_state['training_cache'] = cache
+            _model_state['last_id'] = last_id
+        return
+
+    model = positions = None
+    if not dirty and not rebuild and not _needs_full_rebuild():
+        tids = [tid for tid in added_ids if tid in cache]
+        snapshot = _model_snapshot
+        with training_phase('features'):
+            samples = aggregate_samples(cache.texts(tids), cache.minutes(tids))
+            samples['tokens'] = features.analyze(samples['texts'])
+        # partial_fit ueber wenige Zeilen ist billig; im Trainingsprozess muesste
+        # das komplette Modell hin und zurueck serialisiert werden
+        positions = task_positions(snapshot)
+        model = _update_model_incremental(snapshot.model_dict(), samples, positions)
+    if model is None:
+        with training_phase('features'):
+            samples = aggregate_samples(cache.texts(), cache.minutes())
+            samples['tokens'] = features.analyze(samples['texts'])
+            features.prune(set(samples['texts']))
+        model = run_model_fit(_build_model_full, TRAINING_MODE, samples)
+    elif TRAINING_SHARDS:
+        samples = aggregate_samples(cache.texts(), cache.minutes())
+    for phase, measured in model.pop('phase_profile', {}).items():
+        record_training_phase(phase, **measured)
+
+    if TRAINING_SHARDS:
+        with training_phase('shards'):
+            model['shards'] = train_shards(samples, features, _model_snapshot.shards)
+            apply_shard_minutes(model)
+    # Shard-Dateien des Vorgaengers behalten, bis andere Worker nachgeladen haben
+    previous_shards = _model_snapshot.shards.files() if _model_snapshot.shards else set()
+
+    state = {
+        **model,
+        'trained_at': int(time.time()),
+        'samples': len(cache),
+        'training_cache': cache,
+        'feature_cache': features,
+        'last_id': last_id
+    }
+
+    with _model_lock:
+        _model_state.update({key: value for key, value in state.items() if key not in ModelSnapshot.__slots__})
+    snapshot = publish_model(state)
+    if model.get('model_mode') == 'incremental' and positions is not None:
+        remember_task_positions(snapshot, positions)
+
+    schedule_model_save(state)
+    cleanup_shard_files((state['shards'].files() if state.get('shards') else set()) | previous_shards)
+    logging.info(
+        'Modell trainiert (%s Samples, %s Tasks, %s).',
+        len(cache), len(state['task_texts']),
+        'inkrementell' if state.get('incremental_updates') else 'komplett'
+    )
 
-    termine, meta = result
-    updated = False
 
-    for termin in termine:
+def _get_training_pool() -> ProcessPoolExecutor:
+    global _training_pool
+    with _training_pool_lock:
+        if _training_pool is None:
+            # spawn statt fork: der Serverprozess hat bereits laufende Threads
+            _training_pool = ProcessPoolExecutor(
+                max_workers=max(TRAINING_SHARD_WORKERS, 1) if TRAINING_SHARDS else 1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _training_pool
+
+
+def shutdown_training_pool() -> None:
+    global _training_pool
+    with _training_pool_lock:
+        if _training_pool is not None:
+            _training_pool.shutdown(wait=False, cancel_futures=True)
+            _training_pool = None
+
+
+def run_model_fit(fit_fn, *args):
+    """
+    Fuehrt das Fitting im Trainingsprozess aus, damit sklearn nicht mit den
+    Request-Handlern um den GIL konkurriert. Faellt bei Problemen mit dem
+    Prozess auf ein Fitting im eigenen Prozess zurueck.
+    """
+    return run_model_fits(fit_fn, [args])[0]
+
+
+def run_model_fits(fit_fn, jobs: list) -> list:
+    """Wie run_model_fit fuer mehrere Argument-Tupel, parallel im Pool."""
+    if TRAINING_WORKER_PROCESS and jobs:
         try:
-            tid = int(termin.get('id'))
-        except (TypeError, ValueError):
-            continue
+            pool = _get_training_pool()
+            futures = [pool.submit(fit_fn, *args) for args in jobs]
+            return [future.result() for future in futures]
+        except (BrokenProcessPool, OSError) as err:
+            logging.warning('Trainingsprozess nicht verfuegbar, trainiere lokal: %s', err)
+            shutdown_training_pool()
+    return [fit_fn(*args) for args in jobs]
 
-        if termin.get('ki_training_exclude') or termin.get('status') != 'abgeschlossen':
-            if tid in cache:
-                del cache[tid]
-                updated = True
-            continue
 
-        arbeit = termin.get('arbeit')
-        zeit = termin.get('tatsaechliche_zeit')
-        if not arbeit or zeit is None:
-            if tid in cache:
-                del cache[tid]
-                updated = True
+def aggregate_samples(texts: list, targets) -> dict:
+    """
+    Fasst identische (normalisierte) Texte zu einer Zeile zusammen.
+    Liefert je Text Anzahl, Mittelwert und Median sowie das Trainingsziel
+    (TRAINING_AGGREGATE_TARGET); die Anzahl dient als Sample-Gewicht.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    if not len(texts):
+        empty = np.zeros(0)
+        return {'texts': [], 'counts': empty, 'means': empty, 'medians': empty, 'targets': empty}
+
+    unique, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=targets) / counts
+
+    # Median je Gruppe: nach (Gruppe, Wert) sortieren und die Mitte jeder Gruppe lesen
+    order = np.lexsort((targets, inverse))
+    sorted_targets = targets[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    medians = (sorted_targets[starts + (counts - 1) // 2] + sorted_targets[starts + counts // 2]) / 2.0
+
+    return {
+        'texts': unique.tolist(),
+        'counts': counts.astype(np.float64),
+        'means': means,
+        'medians': medians,
+        'targets': medians if TRAINING_AGGREGATE_TARGET == 'median' else means
+    }
+
+
+def build_task_table(regressor, task_matrix, task_texts: list, previous: Optional[dict] = None,
+                     appended_rows: Optional[int] = None) -> dict:
+    """
+    Vorberechnete Werte je bekanntem Task, zeilengleich mit task_matrix:
+    geklemmte Minuten, Kategorie, Teile-Hinweise und der Vorschlags-Index.
+    Minuten werden immer neu berechnet (ein Predict; partial_fit veraendert
+    alle Koeffizienten), Kategorie/Teile nur fuer neue Texte (bzw. alle, wenn
+    sich die Schluesselwort-Tabellen geaendert haben). Mit appended_rows deckt
+    der Index aus previous alle Zeilen bis auf die letzten appended_rows ab.
+    """
+    previous = previous or {}
+    index = previous.get('task_index') if appended_rows is not None else None
+    if index is None:
+        index = build_suggestion_index(task_matrix)
+    elif appended_rows:
+        index = extend_suggestion_index(index, task_matrix[task_matrix.shape[0] - appended_rows:])
+    minutes = np.clip(np.rint(regressor.predict(task_matrix)), MIN_MINUTES, MAX_MINUTES).astype(np.int32)
+    kategorien, teile = [], []
+    if previous.get('task_keyword_version') == _keyword_engine.version:
+        kategorien = list(previous.get('task_kategorien') or [])
+        teile = list(previous.get('task_teile') or [])
+    for text in task_texts[len(kategorien):]:
+        hints = analyze_keywords(text)
+        kategorien.append(hints['kategorie'])
+        teile.append(list(hints['teile']))
+    return {
+        'task_minutes': minutes,
+        'task_kategorien': kategorien,
+        'task_teile': teile,
+        'task_index': index,
+        'task_keyword_version': _keyword_engine.version
+    }
+
+
+def build_suggestion_index(task_matrix):
+    """
+    Invertierter Index fuer Vorschlaege: task_matrix mit L2-normierten Zeilen
+    als CSC, d.h. je N-Gramm (Spalte) die Liste der Tasks mit Gewicht.
+    """
+    return normalize_rows(sparse.csr_matrix(task_matrix, dtype=np.float64)).tocsc()
+
+
+def extend_suggestion_index(index, new_rows):
+    """
+    Haengt den Index-Block fuer neue Task-Zeilen an (Liste von CSC-Bloecken,
+    zeilenweise hintereinander), statt den Index komplett neu aufzubauen.
+    """
+    blocks = list(index) if isinstance(index, list) else [index]
+    blocks.append(build_suggestion_index(new_rows))
+    if len(blocks) > SUGGESTION_INDEX_MAX_BLOCKS:
+        return sparse.vstack(blocks, format='csc')
+    return blocks
+
+
+def _build_model_full(mode: str, samples: dict) -> dict:
+    """
+    Trainiert Vectorizer und Regressor komplett neu (laeuft im Trainingsprozess).
+    Jede Zeile ist ein eindeutiger Text, daher ist die Design-Matrix zugleich
+    die Task-Matrix fuer Vorschlaege.
+    """
+    task_texts = samples['texts']
+    targets = samples['targets']
+    weights = samples['counts']
+
+    # Messwerte im Trainingsprozess, werden vom Aufrufer nach /metrics uebernommen
+    phases = {}
+    vectorizer = _hashing_vectorizer() if mode == 'incremental' else TfidfVectorizer()
+    with measure_phase('fit_transform', phases, TRAINING_PROFILE):
+        X = _fit_transform_tokens(vectorizer, samples['tokens'])
+    with measure_phase('regressor_fit', phases, TRAINING_PROFILE):
+        if mode == 'incremental':
+            regressor = build_sgd_regressor(X, targets, weights)
+        else:
+            regressor = Ridge(alpha=1.0)
+            regressor.fit(X, targets, sample_weight=weights)
+    with measure_phase('index', phases, TRAINING_PROFILE):
+        task_table = build_task_table(regressor, X, task_texts)
+
+    return {
+        'vectorizer': vectorizer,
+        'regressor': regressor,
+        'task_texts': task_texts,
+        'task_matrix': X.tocsr(),
+        'task_counts': samples['counts'],
+        'task_medians': samples['medians'],
+        **task_table,
+        'model_mode': mode,
+        'full_trained_at': int(time.time()),
+        'incremental_updates': 0,
+        'phase_profile': phases
+    }
+
+
+def shard_fingerprint(samples: dict) -> str:
+    digest = hashlib.sha1('\n'.join(samples['texts']).encode('utf-8'))
+    digest.update(np.asarray(samples['targets'], dtype=np.float64).tobytes())
+    digest.update(np.asarray(samples['counts'], dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def split_shard_samples(samples: dict) -> dict:
+    """Teilt aggregierte Samples nach Kategorie; zu kleine Kategorien entfallen."""
+    groups = {}
+    for row, text in enumerate(samples['texts']):
+        groups.setdefault(analyze_keywords(text)['kategorie'], []).append(row)
+    shards = {}
+    for name, rows in groups.items():
+        counts = samples['counts'][rows]
+        if len(rows) < 3 or counts.sum() < SHARD_MIN_SAMPLES:
             continue
+        shards[name] = {
+            'texts': [samples['texts'][row] for row in rows],
+            'counts': counts,
+            'targets': samples['targets'][rows]
+        }
+    return shards
 
-        try:
-            minutes = float(zeit)
-        except (TypeError, ValueError):
-            if tid in cache:
-                del cache[tid]
-                updated = True
+
+def _fit_shard(name: str, samples: dict, path: str) -> dict:
+    """
+    Trainiert einen Kategorie-Shard und schreibt ihn nach SHARD_DIR (laeuft im
+    Trainingsprozess). Liefert nur Metadaten inkl. Minuten je Text fuer die
+    Task-Tabelle, der Serverprozess laedt den Shard erst bei Bedarf.
+    """
+    vectorizer = TfidfVectorizer()
+    X = _fit_transform_tokens(vectorizer, samples['tokens'])
+    regressor = Ridge(alpha=1.0)
+    regressor.fit(X, samples['targets'], sample_weight=samples['counts'])
+    minutes = np.clip(np.rint(regressor.predict(X)), MIN_MINUTES, MAX_MINUTES).astype(np.int32)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump({'vectorizer': vectorizer, 'regressor': regressor}, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return {
+        'file': os.path.basename(path),
+        'samples': int(samples['counts'].sum()),
+        'texts': samples['texts'],
+        'minutes': minutes
+    }
+
+
+def train_shards(samples: dict, features: FeatureCache, previous: Optional[ShardSet]) -> ShardSet:
+    """
+    Trainiert die Kategorie-Shards parallel; Shards, deren Daten sich seit dem
+    letzten Lauf nicht geaendert haben (gleicher Fingerprint), werden uebernommen.
+    """
+    old_entries = previous.entries if isinstance(previous, ShardSet) else {}
+    entries = {}
+    jobs = []
+    for name, shard in split_shard_samples(samples).items():
+        fingerprint = shard_fingerprint(shard)
+        old = old_entries.get(name)
+        if old and old.get('fingerprint') == fingerprint and os.path.isfile(os.path.join(SHARD_DIR, old['file'])):
+            entries[name] = old
             continue
+        shard['tokens'] = features.analyze(shard['texts'])
+        slug = normalize_text(name).replace(' ', '_')
+        path = os.path.join(SHARD_DIR, f'{slug}-{fingerprint}.joblib')
+        jobs.append((name, fingerprint, (name, shard, path)))
+
+    for (name, fingerprint, _), meta in zip(jobs, run_model_fits(_fit_shard, [job[2] for job in jobs])):
+        entries[name] = {**meta, 'fingerprint': fingerprint}
+    if jobs:
+        logging.info('Shards trainiert: %s (unveraendert: %s)', len(jobs), len(entries) - len(jobs))
+    shards = ShardSet(entries)
+    if isinstance(previous, ShardSet):
+        shards.inherit(previous)
+    return shards
+
+
+def apply_shard_minutes(model: dict) -> None:
+    """Ueberschreibt die Minuten der Task-Tabelle mit den Werten der Shards."""
+    shards = model.get('shards')
+    if not shards:
+        return
+    positions = {text: pos for pos, text in enumerate(model['task_texts'])}
+    minutes = np.array(model['task_minutes'], copy=True)
+    for meta in shards.entries.values():
+        for text, value in zip(meta['texts'], meta['minutes']):
+            pos = positions.get(text)
+            if pos is not None:
+                minutes[pos] = value
+    model['task_minutes'] = minutes
+
+
+def cleanup_shard_files(keep: set) -> None:
+    if not os.path.isdir(SHARD_DIR):
+        return
+    for filename in os.listdir(SHARD_DIR):
+        if filename not in keep:
+            try:
+                os.remove(os.path.join(SHARD_DIR, filename))
+            except OSError as err:
+                logging.warning('Shard-Datei konnte nicht entfernt werden: %s', err)
+
+
+def _hashing_vectorizer() -> HashingVectorizer:
+    # Zustandslos: bestehende Zeilen bleiben bei neuen Texten gueltig
+    return HashingVectorizer(
+        ngram_range=(1, 2),
+        n_features=HASHING_FEATURES,
+        alternate_sign=False,
+        norm='l2'
+    )
+
 
-        if minutes <= 0:
-            if tid in cache:
-                del cache[tid]
-                updated = True
-            continue
+def build_sgd_regressor(X, targets, weights) -> SGDRegressor:
+    """
+    SGD-Regressor fuer den inkrementellen Modus. Startpunkt ist die exakte
+    Ridge-Loesung; SGD uebernimmt nur die folgenden partial_fit-Updates, da
+    wenige gewichtete Zeilen per SGD allein schlecht konvergieren.
+    """
+    ridge = Ridge(alpha=1.0)
+    ridge.fit(X, targets, sample_weight=weights)
+    regressor = SGDRegressor(alpha=1e-4, eta0=0.1, random_state=0)
+    regressor.partial_fit(X[:1], targets[:1])
+    regressor.coef_ = ridge.coef_.copy()
+    regressor.intercept_ = np.array([ridge.intercept_])
+    return regressor
 
-        cache[tid] = {
-            'id': tid,
-            'datum': termin.get('datum'),
-            'text': normalize_text(arbeit),
-            'minutes': minutes
-        }
-        updated = True
 
-    max_id = meta.get('max_id') if isinstance(meta, dict) else None
-    if max_id:
-        last_id = int(max_id)
+def _needs_full_rebuild() -> bool:
+    if TRAINING_MODE != 'incremental':
+        return True
+    snapshot = _model_snapshot
+    mode = snapshot.model_mode
+    full_trained_at = snapshot.full_trained_at or 0
+    updates = snapshot.incremental_updates or 0
+    if mode != 'incremental' or snapshot.regressor is None:
+        return True
+    if TRAINING_FULL_REBUILD_EVERY > 0 and updates >= TRAINING_FULL_REBUILD_EVERY:
+        return True
+    if TRAINING_FULL_REBUILD_HOURS > 0 and time.time() - full_trained_at >= TRAINING_FULL_REBUILD_HOURS * 3600:
+        return True
+    return False
 
-    if not cache:
-        logging.info('Keine Trainingsdaten vorhanden.')
-        with _model_lock:
-            _model_state['training_cache'] = cache
-            _model_state['last_id'] = last_id
-        return
 
-    if not updated:
-        with _model_lock:
-            _model_state['last_id'] = last_id
-        logging.info('Keine neuen Trainingsdaten.')
-        return
+def task_positions(snapshot: ModelSnapshot) -> dict:
+    """
+    Zuordnung Task-Text -> Zeile fuer ein Modell. Wird zwischen inkrementellen
+    Updates weitergereicht statt jedes Mal ueber alle Tasks neu aufgebaut.
+    """
+    with _model_lock:
+        cached = _model_state.get('task_positions')
+    texts = snapshot.task_texts or []
+    if cached and cached[0] == snapshot.serial and len(cached[1]) == len(texts):
+        return cached[1]
+    positions = {text: pos for pos, text in enumerate(texts)}
+    with _model_lock:
+        _model_state['task_positions'] = (snapshot.serial, positions)
+    return positions
 
-    texts = [entry['text'] for entry in cache.values()]
-    targets = [entry['minutes'] for entry in cache.values()]
 
-    if len(texts) < 3:
-        logging.info('Zu wenig Trainingsdaten (%s).', len(texts))
-        with _model_lock:
-            _model_state['training_cache'] = cache
-            _model_state['last_id'] = last_id
-        return
+def remember_task_positions(snapshot: ModelSnapshot, positions: dict) -> None:
+    """Uebernimmt die Zuordnung des Vorgaengers fuer ein inkrementell erweitertes Modell."""
+    texts = snapshot.task_texts or []
+    for pos in range(len(positions), len(texts)):
+        positions[texts[pos]] = pos
+    with _model_lock:
+        _model_state['task_positions'] = (snapshot.serial, positions)
 
-    vectorizer = TfidfVectorizer(ngram_range=(1, 2))
-    X = vectorizer.fit_transform(texts)
-    regressor = Ridge(alpha=1.0)
-    regressor.fit(X, np.array(targets))
 
-    task_texts = []
-    seen = set()
-    for text in texts:
-        if text in seen:
-            continue
-        seen.add(text)
-        task_texts.append(text)
-    task_matrix = vectorizer.transform(task_texts)
+def _update_model_incremental(previous: dict, samples: dict, positions: dict) -> Optional[dict]:
+    """
+    Aktualisiert ein bestehendes Modell nur mit neuen Samples per partial_fit.
+    Laeuft im Serverprozess (kein Kopieren des ganzen Modells in den
+    Trainingsprozess) und arbeitet auf Kopien, da previous veroeffentlicht ist.
+    positions bildet Task-Text -> Zeile ab und wird nicht veraendert; Index und
+    Kategorie/Teile entstehen nur fuer neu angehaengte Zeilen.
+    Mediane bekannter Texte bleiben bis zum naechsten Komplett-Training stehen.
+    """
+    vectorizer = previous.get('vectorizer')
+    task_matrix = previous.get('task_matrix')
+    texts = samples['texts']
+    if not texts or vectorizer is None or task_matrix is None:
+        return None
 
-    state = {
+    phases = {}
+    regressor = copy.deepcopy(previous.get('regressor'))
+    with measure_phase('fit_transform', phases, TRAINING_PROFILE):
+        # Hashing ist zustandslos: eine Kopie kann die vorberechneten N-Gramme abbilden
+        X = _fit_transform_tokens(copy.deepcopy(vectorizer), samples['tokens'])
+    with measure_phase('regressor_fit', phases, TRAINING_PROFILE):
+        for _ in range(max(TRAINING_INCREMENTAL_EPOCHS, 1)):
+            # Gewichte auf Mittelwert 1 skalieren, sonst werden die SGD-Schritte zu gross
+            regressor.partial_fit(X, samples['targets'], sample_weight=samples['counts'] / samples['counts'].mean())
+
+    with measure_phase('index', phases, TRAINING_PROFILE):
+        task_texts = list(previous.get('task_texts') or [])
+        task_counts = np.array(previous.get('task_counts', np.ones(len(task_texts))), dtype=np.float64)
+        task_medians = np.array(previous.get('task_medians', np.zeros(len(task_texts))), dtype=np.float64)
+        new_rows = []
+        for row, text in enumerate(texts):
+            pos = positions.get(text)
+            if pos is None:
+                new_rows.append(row)
+            else:
+                task_counts[pos] += samples['counts'][row]
+        if new_rows:
+            task_texts.extend(texts[row] for row in new_rows)
+            task_matrix = sparse.vstack([task_matrix, X[new_rows]], format='csr')
+            task_counts = np.concatenate([task_counts, samples['counts'][new_rows]])
+            task_medians = np.concatenate([task_medians, samples['medians'][new_rows]])
+        task_table = build_task_table(regressor, task_matrix, task_texts, previous, appended_rows=len(new_rows))
+
+    return {
         'vectorizer': vectorizer,
         'regressor': regressor,
         'task_texts': task_texts,
         'task_matrix': task_matrix,
-        'trained_at': int(time.time()),
-        'samples': len(texts),
-        'training_cache': cache,
-        'last_id': last_id
+        'task_counts': task_counts,
+        'task_medians': task_medians,
+        **task_table,
+        'model_mode': 'incremental',
+        'full_trained_at': previous.get('full_trained_at', 0),
+        'incremental_updates': (previous.get('incremental_updates') or 0) + 1,
+        'phase_profile': phases
     }
 
-    with _model_lock:
-        _model_state.update(state)
-
-    save_model_to_disk(state)
-    logging.info('Modell trainiert (%s Samples, %s Tasks).', len(texts), len(task_texts))
-
 
 def train_model() -> bool:
     if not _train_lock.acquire(blocking=False):
@@ -418,6 +2488,8 @@ def train_model() -> bool:
         return False
 
     start_time = time.time()
+    ok = False
+    begin_training_phases()
     try:
         with _model_lock:
             _model_state['training_in_progress'] = True
@@ -432,6 +2504,7 @@ def train_model() -> bool:
             _model_state['total_trainings'] = _model_state.get('total_trainings', 0) + 1
         
         logging.info('Training abgeschlossen in %.2f Sekunden', duration)
+        ok = True
         return True
     except Exception as err:
         duration = time.time() - start_time
@@ -442,64 +2515,557 @@ def train_model() -> bool:
             _model_state['last_training_duration'] = duration
         return False
     finally:
+        end_training_phases(start_time, time.time() - start_time, ok)
         with _model_lock:
             _model_state['training_in_progress'] = False
         _train_lock.release()
 
 
+def probe_training_watermark() -> Optional[str]:
+    """
+    Liefert einen guenstigen Aenderungsstand der Trainingsdaten (ETag) oder
+    None, wenn keine Quelle ihn bereitstellt. Wie der Abruf beschraenkt er
+    sich auf TRAINING_LOOKBACK_DAYS; nur MAX(id) zaehlt ueber alle Termine.
+    """
+    lookback = max(TRAINING_LOOKBACK_DAYS, 0)
+    if training_db_available():
+        base_filter = (
+            'geloescht_am IS NULL AND arbeit IS NOT NULL '
+            'AND tatsaechliche_zeit IS NOT NULL AND tatsaechliche_zeit > 0'
+        )
+        window_clause = "AND datum >= date('now', ?)" if lookback else ''
+        try:
+            conn = open_training_db()
+            try:
+                row = conn.execute(f'''
+                    SELECT (SELECT MAX(id) FROM termine WHERE {base_filter}), COUNT(*),
+                        SUM(CASE WHEN status = 'abgeschlossen' THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN ki_training_exclude = 1 THEN 1 ELSE 0 END),
+                        TOTAL(tatsaechliche_zeit),
+                        -- Korrekturen an Text/Datum aendern weder Anzahl noch MAX(id)
+                        TOTAL(id * LENGTH(arbeit)),
+                        TOTAL(id * COALESCE(julianday(datum) - 2451545, 0))
+                    FROM termine
+                    WHERE {base_filter}
+                    {window_clause}
+                ''', [f'-{lookback} day'] if lookback else []).fetchone()
+            finally:
+                conn.close()
+            return '-'.join(str(value or 0) for value in (lookback, *row))
+        except sqlite3.Error as err:
+            logging.debug('Watermark aus Datenbank nicht lesbar: %s', err)
+
+    backend_url = get_backend_url()
+    if not backend_url:
+        return None
+    with _model_lock:
+        last_etag = _model_state.get('watermark')
+    headers = {'If-None-Match': last_etag} if last_etag else {}
+    try:
+        response = http_get(
+            'training-watermark',
+            f'{backend_url}/api/ai/training-data/watermark',
+            params={'lookback_days': lookback} if lookback else None,
+            headers=headers,
+            timeout=BACKEND_TIMEOUT_SECONDS
+        )
+        if response.status_code == 304:
+            return last_etag
+        response.raise_for_status()
+        return response.headers.get('ETag') or response.json().get('data', {}).get('etag')
+    except Exception as err:
+        logging.debug('Watermark nicht abrufbar: %s', err)
+        return None
+
+
 def training_loop() -> None:
+    """
+    Prueft alle TRAINING_POLL_SECONDS den Aenderungsstand der Trainingsdaten.
+    Neue Daten werden gesammelt, bis TRAINING_DEBOUNCE_SECONDS lang nichts mehr
+    hinzukommt (spaetestens nach TRAINING_DEBOUNCE_MAX_SECONDS), und dann
+    trainiert. Ohne Watermark (altes Backend) gilt TRAINING_INTERVAL_MINUTES.
+    Auch bei unveraendertem Watermark laeuft nach TRAINING_INTERVAL_MINUTES
+    ein normaler Abruf, falls eine Korrektur die Pruefsumme nicht aendert.
+    """
+    last_cycle_at = 0.0
+    pending_since = None
+    last_change_at = 0.0
+    seen_mark = None
+
     while True:
-        train_model()
-        if not get_backend_url():
+        if not get_backend_url() and not training_db_available():
+            train_model()
             time.sleep(60)
             continue
-        time.sleep(TRAINING_INTERVAL_MINUTES * 60)
+
+        now = time.time()
+        mark = probe_training_watermark()
+        with _model_lock:
+            trained_mark = _model_state.get('watermark')
+
+        if mark is None:
+            # Kein Aenderungsstand verfuegbar: fester Intervall wie bisher
+            if now - last_cycle_at >= TRAINING_INTERVAL_MINUTES * 60:
+                train_model()
+                last_cycle_at = time.time()
+        elif mark == trained_mark:
+            pending_since = None
+            if now - last_cycle_at >= TRAINING_INTERVAL_MINUTES * 60:
+                logging.info('Trainingsdaten laut Watermark unveraendert - Kontrollabruf.')
+                train_model()
+                last_cycle_at = time.time()
+        else:
+            if pending_since is None:
+                pending_since = now
+            if mark != seen_mark:
+                last_change_at = now
+            seen_mark = mark
+            quiet = now - last_change_at >= TRAINING_DEBOUNCE_SECONDS
+            overdue = now - pending_since >= TRAINING_DEBOUNCE_MAX_SECONDS
+            if quiet or overdue or not trained_mark:
+                train_model()
+                pending_since = None
+                last_cycle_at = time.time()
+
+        time.sleep(max(TRAINING_POLL_SECONDS, 1))
+
+
+def _file_token(path: str) -> Optional[tuple]:
+    """Aenderungsmerkmal einer Datei ohne sie zu lesen (os.replace wechselt die Inode)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
 
-def predict_minutes(text: str) -> Optional[int]:
-    with _model_lock:
-        vectorizer = _model_state.get('vectorizer')
-        regressor = _model_state.get('regressor')
-    if not vectorizer or not regressor:
+def is_trainer() -> bool:
+    return _worker_state['role'] == 'trainer'
+
+
+def try_become_trainer() -> bool:
+    """
+    Versucht die exklusive Sperre TRAINER_LOCK_PATH zu bekommen. Das
+    Betriebssystem gibt sie frei, sobald der haltende Prozess endet.
+    """
+    global _trainer_lock_file
+    if fcntl is None:
+        return True
+    ensure_data_dir()
+    handle = open(TRAINER_LOCK_PATH, 'a+')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _trainer_lock_file = handle
+    return True
+
+
+def sync_model_from_disk() -> bool:
+    """Laedt den Modellstand neu, wenn der Trainer ein neues Manifest geschrieben hat."""
+    with _reload_lock:
+        token = _file_token(MODEL_MANIFEST)
+        if token is None or token == _worker_state['manifest_token']:
+            return False
+        # Token vor dem Laden: schreibt der Trainer parallel, folgt ein neues Manifest
+        _worker_state['manifest_token'] = token
+        if not load_model_from_disk():
+            return False
+        _worker_state['model_reloads'] += 1
+    refresh_storage_stats()
+    return True
+
+
+def read_control() -> dict:
+    try:
+        with open(CONTROL_PATH, encoding='utf-8') as handle:
+            data = json.load(handle)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_control(**changes) -> None:
+    """
+    Teilt Laufzeit-Einstellungen und Retrain-Anforderungen mit den anderen
+    Workern (CONTROL_PATH, per Dateisperre gegen parallele Schreiber).
+    """
+    try:
+        ensure_data_dir()
+        with open(CONTROL_PATH + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            data = read_control()
+            data.update(changes)
+            tmp_path = f'{CONTROL_PATH}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(data, handle)
+            os.replace(tmp_path, CONTROL_PATH)
+    except OSError as err:
+        logging.warning('Steuerdatei konnte nicht geschrieben werden: %s', err)
+
+
+def apply_control(initial: bool = False) -> None:
+    """
+    Uebernimmt geaenderte Eintraege der Steuerdatei. Beim Start wird nur der
+    Stand gemerkt, damit Werte eines frueheren Laufs nicht wieder aufleben;
+    Retrain-Anforderungen prueft handle_retrain_request am Prozessstart.
+    """
+    global TRAINING_LOOKBACK_DAYS
+    token = _file_token(CONTROL_PATH)
+    if token == _worker_state['control_token']:
+        return
+    _worker_state['control_token'] = token
+    data = read_control()
+    seen = _worker_state['control']
+    _worker_state['control'] = data
+    if initial:
+        return
+    changed = {key: value for key, value in data.items() if seen.get(key) != value}
+    if changed.get('backend_url'):
+        set_backend_url(changed['backend_url'], share=False)
+    if changed.get('lookback_days'):
+        TRAINING_LOOKBACK_DAYS = int(changed['lookback_days'])
+    handle_retrain_request(data)
+
+
+def handle_retrain_request(data: dict) -> None:
+    """
+    Startet ein von einem anderen Worker angefordertes Retrain, wenn dieser
+    Prozess trainiert und die Anforderung nach seinem Start kam und noch
+    unbeantwortet ist. So geht keine Anforderung verloren, die waehrend des
+    Starts oder vor der Uebernahme der Trainer-Rolle geschrieben wurde.
+    """
+    requested = data.get('retrain_requested_at') or 0
+    answered = (data.get('retrain_result') or {}).get('requested_at') or 0
+    if not is_trainer() or requested <= max(_worker_state['started_at'], _worker_state['retrain_started_at'], answered):
+        return
+    _worker_state['retrain_started_at'] = requested
+    logging.info('Retrain von anderem Worker angefordert.')
+    threading.Thread(target=run_requested_retrain, args=(requested,), daemon=True).start()
+
+
+def run_requested_retrain(requested: float) -> None:
+    """Trainiert fuer einen anderen Worker und legt das Ergebnis in der Steuerdatei ab."""
+    # Laeuft gerade ein Training, danach erneut trainieren: die Anforderung
+    # kann neuere Daten meinen, als das laufende Training abgerufen hat
+    with _train_lock:
+        pass
+    old = _model_snapshot
+    ok = train_model()
+    snapshot = _model_snapshot
+    write_control(retrain_result={
+        'requested_at': requested,
+        'ok': ok,
+        'error': None if ok else _model_state.get('last_error'),
+        'serial': snapshot.serial,
+        'updated': snapshot.serial != old.serial,
+        'samples': snapshot.samples,
+        'samples_added': snapshot.samples - old.samples,
+        'trained_at': snapshot.trained_at,
+        'cache_size': len(_model_state.get('training_cache') or ())
+    })
+
+
+def start_trainer() -> None:
+    _worker_state['role'] = 'trainer'
+    logging.info('Worker %s uebernimmt das Training.', os.getpid())
+    # Stand eines vorherigen Trainers uebernehmen, bevor weitertrainiert wird
+    sync_model_from_disk()
+    handle_retrain_request(read_control())
+    register_mdns()
+    start_backend_discovery()
+    threading.Thread(target=training_loop, daemon=True).start()
+
+
+def process_uptime() -> Optional[float]:
+    """Sekunden seit Prozessstart (Linux /proc), sonst None."""
+    try:
+        with open('/proc/self/stat', encoding='ascii') as handle:
+            started = int(handle.read().rsplit(')', 1)[1].split()[19]) / os.sysconf('SC_CLK_TCK')
+        with open('/proc/uptime', encoding='ascii') as handle:
+            return round(float(handle.read().split()[0]) - started, 2)
+    except (OSError, ValueError, IndexError, AttributeError):
         return None
-    X = vectorizer.transform([normalize_text(text)])
-    minutes = float(regressor.predict(X)[0])
-    minutes = int(round(minutes))
-    minutes = max(MIN_MINUTES, min(MAX_MINUTES, minutes))
-    return minutes
 
 
-def suggest_tasks(text: str) -> list:
-    with _model_lock:
-        vectorizer = _model_state.get('vectorizer')
-        task_texts = _model_state.get('task_texts', [])
-        task_matrix = _model_state.get('task_matrix')
+def _timed_phase(name: str, fn) -> None:
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as err:
+        logging.warning('Startphase %s fehlgeschlagen: %s', name, err)
+    finally:
+        _startup['phases_ms'][name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def warm_imports() -> None:
+    """Loest alle LazyImport-Platzhalter auf, damit der erste Request nicht wartet."""
+    for placeholder in list(LazyImport.registry):
+        if globals().get(placeholder._alias) is placeholder:
+            placeholder.resolve()
+
+
+def finish_startup() -> None:
+    _worker_state['manifest_token'] = _file_token(MODEL_MANIFEST)
+    _timed_phase('load_model', load_model_from_disk)
+    _timed_phase('storage_stats', refresh_storage_stats)
+    _timed_phase('control', lambda: apply_control(initial=True))
+    _timed_phase('warm_imports', warm_imports)
+    _startup['ready'] = True
+    _startup['ready_s'] = process_uptime()
+    logging.info(
+        'Start abgeschlossen nach %ss (Modul geladen nach %ss, Phasen %s ms)',
+        _startup['ready_s'], _startup['module_loaded_s'], _startup['phases_ms']
+    )
+
+
+def worker_loop() -> None:
+    """
+    Bei mehreren uvicorn-Workern (--workers N) trainiert nur der Worker, der
+    die Sperre TRAINER_LOCK_PATH haelt. Die uebrigen laden alle
+    MODEL_WATCH_SECONDS einen neu veroeffentlichten Modellstand aus dem
+    Manifest nach und bewerben sich erneut, falls der Trainer endet.
+    """
+    finish_startup()
+    while True:
+        try:
+            if not is_trainer():
+                if try_become_trainer():
+                    start_trainer()
+                else:
+                    _worker_state['role'] = 'follower'
+                    sync_model_from_disk()
+            apply_control()
+        except Exception as err:
+            logging.warning('Worker-Abgleich fehlgeschlagen: %s', err)
+        time.sleep(max(MODEL_WATCH_SECONDS, 0.1))
+
+
+def request_remote_retrain() -> dict:
+    """
+    Retrain ueber den Trainer-Worker anstossen und kurz auf dessen Ergebnis
+    (retrain_result in der Steuerdatei, zugeordnet ueber den Anforderungszeitpunkt)
+    warten. Ein neues Modell wird danach aus dem Manifest nachgeladen.
+    """
+    requested = time.time()
+    write_control(retrain_requested_at=requested)
+    # Warte kurz auf Ergebnis (max 5 Sekunden)
+    result = None
+    for _ in range(50):
+        time.sleep(0.1)
+        result = read_control().get('retrain_result') or {}
+        if result.get('requested_at') == requested:
+            break
+        result = None
+    snapshot = _model_snapshot
+    if result is None:
+        return {
+            'success': True,
+            'message': 'Training beim Trainer-Worker angefordert',
+            'training_in_progress': True,
+            'samples': snapshot.samples,
+            'trained_at': snapshot.trained_at
+        }
+    if not result.get('ok'):
+        return {
+            'success': False,
+            'message': f"Training fehlgeschlagen: {result.get('error') or 'unbekannter Fehler'}",
+            'training_in_progress': False,
+            'samples': snapshot.samples,
+            'trained_at': snapshot.trained_at
+        }
+    if result.get('updated'):
+        # Das Manifest wird nach dem Training im Hintergrund geschrieben
+        for _ in range(50):
+            if sync_model_from_disk() or _model_snapshot.trained_at >= result.get('trained_at', 0):
+                break
+            time.sleep(0.1)
+    return {
+        'success': True,
+        'message': retrain_message(
+            result.get('samples', 0), result.get('samples_added', 0),
+            result.get('updated', False), result.get('cache_size', 0)
+        ),
+        'training_in_progress': False,
+        'samples': result.get('samples', 0),
+        'samples_added': result.get('samples_added', 0),
+        'trained_at': result.get('trained_at'),
+        'cache_size': result.get('cache_size', 0)
+    }
+
+
+def retrain_message(samples: int, samples_added: int, updated: bool, cache_size: int) -> str:
+    """Rueckmeldung nach einem Retrain, gleich fuer lokales und Trainer-Worker-Training."""
+    message_parts = []
+    if samples == 0:
+        message_parts.append('Keine Trainingsdaten verfügbar')
+    elif samples_added > 0:
+        message_parts.append(f'Training erfolgreich: {samples_added} neue Samples hinzugefügt')
+    elif updated:
+        message_parts.append('Modell erfolgreich aktualisiert')
+    else:
+        message_parts.append('Keine neuen Trainingsdaten verfügbar')
+
+    message_parts.append(f'Gesamt: {samples} Samples')
+    if cache_size:
+        message_parts.append(f'{cache_size} Termine im Cache')
+    return ' • '.join(message_parts)
+
+
+def predict_minutes_batch(texts: List[str], snapshot: Optional[ModelSnapshot] = None) -> Optional[List[int]]:
+    """
+    Schaetzt Minuten fuer eine ganze Liste in einem Transform/Predict-Aufruf
+    auf demselben Modellstand. Bereits bekannte Texte kommen aus dem
+    Vorhersage-Cache. None, wenn noch kein Modell trainiert ist.
+    """
+    snapshot = snapshot or _model_snapshot
+    if not snapshot.ready:
+        return None
+    version = snapshot.version
+    if not texts:
+        return []
+
+    step_start = time.perf_counter()
+    norms = [normalize_text(text) for text in texts]
+    observe_inference('normalize', time.perf_counter() - step_start)
+    result = [None] * len(norms)
+    missing = {}
+    for index, norm in enumerate(norms):
+        cached = _prediction_cache.get('minutes', norm, version)
+        if cached is None:
+            missing.setdefault(norm, []).append(index)
+        else:
+            result[index] = cached
+
+    # Texte je Modell gruppieren: Kategorie-Shard, falls vorhanden, sonst global
+    groups = {}
+    for norm in missing:
+        name = keyword_hints(norm)['kategorie'] if snapshot.shards else None
+        groups.setdefault(name, []).append(norm)
+    for name, group in groups.items():
+        model = snapshot.shards.get(name) if name else None
+        vectorizer = model['vectorizer'] if model else snapshot.vectorizer
+        regressor = model['regressor'] if model else snapshot.regressor
+        step_start = time.perf_counter()
+        X = vectorizer.transform(group)
+        transformed = time.perf_counter()
+        predicted = regressor.predict(X)
+        observe_inference('transform', transformed - step_start)
+        observe_inference('predict', time.perf_counter() - transformed)
+        minutes = np.clip(np.rint(predicted), MIN_MINUTES, MAX_MINUTES)
+        for norm, value in zip(group, minutes):
+            value = int(value)
+            _prediction_cache.put('minutes', norm, version, value)
+            for index in missing[norm]:
+                result[index] = value
+    return result
+
+
+def predict_minutes(text: str) -> Optional[int]:
+    minutes = predict_minutes_batch([text])
+    return minutes[0] if minutes else None
+
 
-    if not vectorizer or task_matrix is None or not task_texts:
+def _index_postings(block, columns, weights) -> tuple:
+    """Zeilen und Teilprodukte aller Postings der Anfrage-Spalten in einem CSC-Block."""
+    starts = block.indptr[columns]
+    lengths = block.indptr[columns + 1] - starts
+    total = int(lengths.sum())
+    # Positionen aller betroffenen Postings in block.indices/block.data
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    positions = offsets + np.arange(total)
+    return block.indices[positions].astype(np.int64), block.data[positions] * np.repeat(weights, lengths)
+
+
+def top_k_tasks(index, query, k: int) -> list:
+    """
+    Cosinus-Top-k ueber den invertierten Index: nur die Postings der N-Gramme
+    aus der Anfrage werden summiert, danach Teilauswahl per argpartition.
+    Der Aufwand haengt von der Ueberlappung ab, nicht von der Anzahl Tasks.
+    """
+    query = sparse.csr_matrix(query)
+    norm = np.sqrt(np.dot(query.data, query.data))
+    if not norm or k <= 0:
         return []
 
-    query = vectorizer.transform([normalize_text(text)])
-    scores = cosine_similarity(task_matrix, query).ravel()
-    top_idx = scores.argsort()[::-1][:SUGGESTION_LIMIT]
-    return [task_texts[i] for i in top_idx if scores[i] > 0]
+    columns = query.indices
+    weights = query.data / norm
+    row_parts, product_parts = [], []
+    offset = 0
+    for block in (index if isinstance(index, list) else [index]):
+        rows, products = _index_postings(block, columns, weights)
+        row_parts.append(rows + offset)
+        product_parts.append(products)
+        offset += block.shape[0]
+    rows = np.concatenate(row_parts)
+    if not len(rows):
+        return []
+    products = np.concatenate(product_parts)
+
+    candidates, inverse = np.unique(rows, return_inverse=True)
+    scores = np.bincount(inverse, weights=products)
+    if len(candidates) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(candidates))
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [int(candidates[i]) for i in top if scores[i] > 0]
 
 
-def teile_bedarf(text: str) -> list:
+def suggest_task_indices(text: str, snapshot: Optional[ModelSnapshot] = None) -> list:
+    """Indizes der aehnlichsten bekannten Tasks (Zeilen von task_matrix)."""
+    snapshot = snapshot or _model_snapshot
+    if not snapshot.vectorizer or snapshot.task_index is None or not snapshot.task_texts:
+        return []
+
+    step_start = time.perf_counter()
+    norm = normalize_text(text)
+    observe_inference('normalize', time.perf_counter() - step_start)
+    cached = _prediction_cache.get('suggest', norm, snapshot.version)
+    if cached is not None:
+        return list(cached)
+
+    step_start = time.perf_counter()
+    query = snapshot.vectorizer.transform([norm])
+    transformed = time.perf_counter()
+    indices = top_k_tasks(snapshot.task_index, query, SUGGESTION_LIMIT)
+    observe_inference('transform', transformed - step_start)
+    observe_inference('similarity', time.perf_counter() - transformed)
+    _prediction_cache.put('suggest', norm, snapshot.version, tuple(indices))
+    return indices
+
+
+def suggest_tasks(text: str) -> list:
+    snapshot = _model_snapshot
+    return [snapshot.task_texts[i] for i in suggest_task_indices(text, snapshot)]
+
+
+def keyword_hints(text: str) -> dict:
+    """Kategorie, Prioritaet und Teile-Namen zu einem Text (ueber den Vorhersage-Cache)."""
     norm = normalize_text(text)
-    teile = []
-    seen = set()
-    for keys, items in TEILE_HINTS:
-        if any(key in norm for key in keys):
-            for teil in items:
-                if teil in seen:
-                    continue
-                seen.add(teil)
-                teile.append({
-                    'name': teil,
-                    'grund': 'Schluesselwort erkannt',
-                    'sicherheit': 'mittel'
-                })
-    return teile
+    version = _keyword_engine.version
+    hints = _keyword_cache.get('keywords', norm, version)
+    if hints is None:
+        hints = _keyword_engine.analyze(norm)
+        _keyword_cache.put('keywords', norm, version, hints)
+    return hints
+
+
+def teile_bedarf(text: str) -> list:
+    return [
+        {
+            'name': teil,
+            'grund': 'Schluesselwort erkannt',
+            'sicherheit': 'mittel'
+        }
+        for teil in keyword_hints(text)['teile']
+    ]
 
 
 def get_local_ip() -> str:
@@ -588,42 +3154,45 @@ def unregister_mdns() -> None:
 
 @app.on_event('startup')
 def on_startup() -> None:
-    load_model_from_disk()
-    register_mdns()
-    start_backend_discovery()
-    thread = threading.Thread(target=training_loop, daemon=True)
+    # Modell und schwere Importe laden im Hintergrund, /health antwortet sofort
+    thread = threading.Thread(target=worker_loop, daemon=True)
     thread.start()
 
 
 @app.on_event('shutdown')
 def on_shutdown() -> None:
+    if not flush_model_save(timeout=60):
+        logging.warning('Modell wird beim Beenden noch gespeichert.')
     unregister_mdns()
+    reset_http_session()
+    shutdown_training_pool()
 
 
 @app.get('/health')
 def health() -> dict:
-    with _model_lock:
-        state_copy = {
-            'status': 'ok',
-            'device': socket.gethostname(),
-            'backend_url': get_backend_url() or None,
-            'backend_discovery': BACKEND_DISCOVERY_ENABLED,
-            'model_samples': _model_state.get('samples', 0),
-            'trained_at': _model_state.get('trained_at', 0),
-            'last_id': _model_state.get('last_id', 0),
-            'lookback_days': TRAINING_LOOKBACK_DAYS,
-            'training_in_progress': _model_state.get('training_in_progress', False),
-            'last_train_request_at': _model_state.get('last_train_request_at', 0),
-            'last_training_duration': _model_state.get('last_training_duration', 0),
-            'total_trainings': _model_state.get('total_trainings', 0),
-            'last_error': _model_state.get('last_error'),
-            'last_backup_at': _model_state.get('last_backup_at', 0),
-            'service_port': SERVICE_PORT,
-            'training_interval_minutes': TRAINING_INTERVAL_MINUTES,
-            'model_exists': os.path.isfile(MODEL_PATH),
-            'backup_count': len([f for f in os.listdir(MODEL_BACKUP_DIR) if f.startswith('model_')]) if os.path.isdir(MODEL_BACKUP_DIR) else 0
-        }
-    return state_copy
+    snapshot = _model_snapshot
+    return {
+        'status': 'ok',
+        'ready': _startup['ready'],
+        'device': socket.gethostname(),
+        'backend_url': get_backend_url() or None,
+        'backend_discovery': BACKEND_DISCOVERY_ENABLED,
+        'model_samples': snapshot.samples,
+        'trained_at': snapshot.trained_at,
+        'last_id': _model_state.get('last_id', 0),
+        'lookback_days': TRAINING_LOOKBACK_DAYS,
+        'training_in_progress': _model_state.get('training_in_progress', False),
+        'last_train_request_at': _model_state.get('last_train_request_at', 0),
+        'last_training_duration': _model_state.get('last_training_duration', 0),
+        'total_trainings': _model_state.get('total_trainings', 0),
+        'last_error': _model_state.get('last_error'),
+        'last_backup_at': _model_state.get('last_backup_at', 0),
+        'service_port': SERVICE_PORT,
+        'training_interval_minutes': TRAINING_INTERVAL_MINUTES,
+        'model_exists': _model_state.get('model_exists', False),
+        'backup_count': _model_state.get('backup_count', 0),
+        'worker_role': _worker_state['role']
+    }
 
 
 @app.post('/api/configure-backend')
@@ -666,6 +3235,7 @@ def configure_lookback(days: int = None) -> dict:
     
     if days is not None and days > 0:
         TRAINING_LOOKBACK_DAYS = days
+        write_control(lookback_days=days)
         return {
             'success': True,
             'message': f'Lookback Days auf {days} gesetzt',
@@ -681,26 +3251,31 @@ def configure_lookback(days: int = None) -> dict:
 
 
 @app.get('/api/predict')
-def predict_time(req: ZeitRequest, request: Request) -> dict:
+@app.post('/api/suggest-arbeiten')
+def predict_time(req: ArbeitenRequest, request: Request) -> dict:
     detect_backend_from_request(request)
     
     beschreibung = req.beschreibung or ''
     fahrzeug = req.fahrzeug or ''
 
-    suggestions = suggest_tasks(beschreibung)
+    # Vorschlaege und Tabelle aus demselben Modellstand
+    snapshot = _model_snapshot
+    indices = suggest_task_indices(beschreibung, snapshot)
+
+    hints = keyword_hints(beschreibung)
+    prioritaet = hints['prioritaet']
     arbeiten = []
-    for task in suggestions:
-        minutes = predict_minutes(task) or DEFAULT_MINUTES
+    for i in indices:
+        task = snapshot.task_texts[i]
         arbeiten.append({
             'name': task,
             'beschreibung': task,
-            'dauer_stunden': minutes_to_hours(minutes),
-            'prioritaet': prioritaet_aus_text(beschreibung),
-            'kategorie': kategorisiere_arbeit(task)
+            'dauer_stunden': minutes_to_hours(int(snapshot.task_minutes[i])),
+            'prioritaet': prioritaet,
+            'kategorie': snapshot.task_kategorien[i]
         })
 
     gesamt = sum(item['dauer_stunden'] for item in arbeiten)
-    teile = teile_bedarf(beschreibung)
 
     return {
         'success': True,
@@ -709,7 +3284,7 @@ def predict_time(req: ZeitRequest, request: Request) -> dict:
             'gesamtdauer_stunden': round(gesamt, 2),
             'empfehlung': 'Externe KI: Vorschlaege aus Trainingsdaten.',
             'hinweise': [f'Fahrzeug: {fahrzeug}'] if fahrzeug else [],
-            'teile_vermutung': [t['name'] for t in teile]
+            'teile_vermutung': list(hints['teile'])
         }
     }
 
@@ -719,20 +3294,21 @@ def estimate_zeit(req: ZeitRequest, request: Request) -> dict:
     detect_backend_from_request(request)
     
     arbeiten = req.arbeiten or []
-    zeiten = []
+    snapshot = _model_snapshot
+    predicted = predict_minutes_batch(arbeiten, snapshot)
+    if predicted is None:
+        minutes_list, quelle = [DEFAULT_MINUTES] * len(arbeiten), 'fallback'
+    else:
+        minutes_list, quelle = predicted, 'modell'
 
-    for arbeit in arbeiten:
-        minutes = predict_minutes(arbeit)
-        if minutes is None:
-            minutes = DEFAULT_MINUTES
-            quelle = 'fallback'
-        else:
-            quelle = 'modell'
-        zeiten.append({
+    zeiten = [
+        {
             'arbeit': arbeit,
             'dauer_stunden': minutes_to_hours(minutes),
             'quelle': quelle
-        })
+        }
+        for arbeit, minutes in zip(arbeiten, minutes_list)
+    ]
 
     gesamtdauer = round(sum(item['dauer_stunden'] for item in zeiten), 2)
     return {
@@ -741,11 +3317,155 @@ def estimate_zeit(req: ZeitRequest, request: Request) -> dict:
             'zeiten': zeiten,
             'gesamtdauer': gesamtdauer,
             'quelle': 'externes Modell',
-            'modell_samples': _model_state.get('samples', 0)
+            'modell_samples': snapshot.samples
         }
     }
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _split_bulk_buffer(buffer: str, array_mode: bool, final: bool) -> tuple:
+    """
+    Zerlegt den gelesenen Teil des Bodys in vollstaendige Datensaetze.
+    Liefert ([(record, fehler), ...], unverarbeiteter Rest).
+    """
+    items = []
+    pos = 0
+    separators = ' \t\r\n,[]' if array_mode else ' \t\r\n'
+    while True:
+        while pos < len(buffer) and buffer[pos] in separators:
+            pos += 1
+        if pos >= len(buffer):
+            break
+        if array_mode:
+            try:
+                record, pos = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError as err:
+                if final or len(buffer) - pos > BULK_MAX_RECORD_BYTES:
+                    # ohne Zeilengrenzen laesst sich nach einem Fehler nicht weiterlesen
+                    items.append((None, f'Ungueltiges JSON: {err.msg}'))
+                    pos = len(buffer)
+                break
+            items.append((record, None))
+        else:
+            end = buffer.find('\n', pos)
+            if end < 0:
+                if not final and len(buffer) - pos <= BULK_MAX_RECORD_BYTES:
+                    break
+                end = len(buffer)
+            line = buffer[pos:end]
+            pos = end + 1
+            try:
+                items.append((json.loads(line), None))
+            except ValueError as err:
+                items.append((None, f'Ungueltiges JSON: {err}'))
+    return items, buffer[pos:]
+
+
+async def iter_bulk_records(request: Request):
+    """
+    Liest Datensaetze aus dem Request-Body, ohne ihn komplett zu puffern:
+    NDJSON (ein Objekt pro Zeile) oder ein JSON-Array von Objekten.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    array_mode = None
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        if array_mode is None and buffer.strip():
+            array_mode = buffer.lstrip().startswith('[')
+        if array_mode is not None:
+            items, buffer = _split_bulk_buffer(buffer, array_mode, final=False)
+            for item in items:
+                yield item
+    buffer += decoder.decode(b'', final=True)
+    items, _ = _split_bulk_buffer(buffer, bool(array_mode), final=True)
+    for item in items:
+        yield item
+
+
+def estimate_bulk_chunk(items: list) -> str:
+    """Schaetzt einen Block Datensaetze mit einem Vorhersage-Aufruf; liefert NDJSON."""
+    snapshot = _model_snapshot
+    records = []
+    texts = []
+    for record, error in items:
+        record_id = record.get('id') if isinstance(record, dict) else None
+        arbeiten = record.get('arbeiten') if isinstance(record, dict) else None
+        if error is None and (
+            not isinstance(arbeiten, list) or not all(isinstance(arbeit, str) for arbeit in arbeiten)
+        ):
+            error = 'arbeiten muss eine Liste von Texten sein'
+        records.append((record_id, None if error else arbeiten, error))
+        if not error:
+            texts.extend(arbeiten)
+
+    predicted = predict_minutes_batch(texts, snapshot)
+    quelle = 'fallback' if predicted is None else 'modell'
+    if predicted is None:
+        predicted = [DEFAULT_MINUTES] * len(texts)
+
+    lines = []
+    offset = 0
+    for record_id, arbeiten, error in records:
+        if error:
+            result = {'id': record_id, 'success': False, 'error': error}
+        else:
+            zeiten = [
+                {
+                    'arbeit': arbeit,
+                    'dauer_stunden': minutes_to_hours(minutes),
+                    'quelle': quelle
+                }
+                for arbeit, minutes in zip(arbeiten, predicted[offset:offset + len(arbeiten)])
+            ]
+            offset += len(arbeiten)
+            result = {
+                'id': record_id,
+                'success': True,
+                'zeiten': zeiten,
+                'gesamtdauer': round(sum(item['dauer_stunden'] for item in zeiten), 2)
+            }
+        lines.append(json.dumps(result, ensure_ascii=False))
+    return '\n'.join(lines) + '\n'
+
+
+async def stream_bulk_estimates(request: Request):
+    chunk = []
+    async for item in iter_bulk_records(request):
+        chunk.append(item)
+        if len(chunk) >= max(BULK_CHUNK_SIZE, 1):
+            yield await run_in_threadpool(estimate_bulk_chunk, chunk)
+            chunk = []
+    if chunk:
+        yield await run_in_threadpool(estimate_bulk_chunk, chunk)
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse, deren Generator noch den Request-Body liest. Starlette
+    wartet bei ASGI < 2.4 (uvicorn) parallel per receive() auf einen Disconnect
+    und wuerde dabei die Body-Nachrichten verbrauchen; ein Abbruch des Clients
+    faellt hier beim naechsten send() auf.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+@app.post('/api/estimate-zeit/bulk')
+async def estimate_zeit_bulk(request: Request) -> BodyStreamingResponse:
+    """
+    Bulk-Schaetzung fuer viele Termine: Body als NDJSON oder JSON-Array von
+    {id, arbeiten[], fahrzeug}. Antwort als NDJSON, eine Zeile je Datensatz in
+    Eingabereihenfolge; Body wird blockweise gelesen und beantwortet. Bei
+    grossen Mengen muss der Client die Antwort schon waehrend des Sendens lesen.
+    """
+    detect_backend_from_request(request)
+    return BodyStreamingResponse(stream_bulk_estimates(request), media_type='application/x-ndjson')
+
+
 @app.post('/api/teile-bedarf')
 def teile_bedarf_endpoint(request: ArbeitenRequest) -> dict:
     beschreibung = request.beschreibung or ''
@@ -762,20 +3482,23 @@ def teile_bedarf_endpoint(request: ArbeitenRequest) -> dict:
 
 @app.post('/api/retrain')
 def retrain_endpoint() -> dict:
+    if not is_trainer():
+        return request_remote_retrain()
+
     # Prüfe ob Training bereits läuft
-    with _model_lock:
-        if _model_state.get('training_in_progress', False):
-            return {
-                'success': False,
-                'message': 'Training läuft bereits',
-                'training_in_progress': True,
-                'samples': _model_state.get('samples', 0),
-                'trained_at': _model_state.get('trained_at', 0)
-            }
-        
-        # Merke alte Werte
-        old_samples = _model_state.get('samples', 0)
-        old_trained_at = _model_state.get('trained_at', 0)
+    snapshot = _model_snapshot
+    if _model_state.get('training_in_progress', False):
+        return {
+            'success': False,
+            'message': 'Training läuft bereits',
+            'training_in_progress': True,
+            'samples': snapshot.samples,
+            'trained_at': snapshot.trained_at
+        }
+
+    # Merke alte Werte
+    old_samples = snapshot.samples
+    old_serial = snapshot.serial
     
     # Starte Training
     started = train_model()
@@ -790,17 +3513,16 @@ def retrain_endpoint() -> dict:
     # Warte kurz auf Ergebnis (max 5 Sekunden)
     max_wait = 50  # 50 x 100ms = 5 Sekunden
     for _ in range(max_wait):
-        with _model_lock:
-            if not _model_state.get('training_in_progress', False):
-                break
+        if not _model_state.get('training_in_progress', False):
+            break
         time.sleep(0.1)
     
     # Hole aktuelle Werte
-    with _model_lock:
-        new_samples = _model_state.get('samples', 0)
-        new_trained_at = _model_state.get('trained_at', 0)
-        training_cache = _model_state.get('training_cache', {})
-        still_running = _model_state.get('training_in_progress', False)
+    snapshot = _model_snapshot
+    new_samples = snapshot.samples
+    new_trained_at = snapshot.trained_at
+    training_cache = _model_state.get('training_cache') or ()
+    still_running = _model_state.get('training_in_progress', False)
     
     if still_running:
         return {
@@ -813,24 +3535,9 @@ def retrain_endpoint() -> dict:
     
     # Training abgeschlossen
     samples_added = new_samples - old_samples
-    message_parts = []
-    
-    if new_samples == 0:
-        message_parts.append('Keine Trainingsdaten verfügbar')
-    elif samples_added > 0:
-        message_parts.append(f'Training erfolgreich: {samples_added} neue Samples hinzugefügt')
-    elif new_trained_at > old_trained_at:
-        message_parts.append('Modell erfolgreich aktualisiert')
-    else:
-        message_parts.append('Keine neuen Trainingsdaten verfügbar')
-    
-    message_parts.append(f'Gesamt: {new_samples} Samples')
-    if training_cache:
-        message_parts.append(f'{len(training_cache)} Termine im Cache')
-    
     return {
         'success': True,
-        'message': ' • '.join(message_parts),
+        'message': retrain_message(new_samples, samples_added, snapshot.serial > old_serial, len(training_cache)),
         'training_in_progress': False,
         'samples': new_samples,
         'samples_added': samples_added,
@@ -843,7 +3550,7 @@ def retrain_endpoint() -> dict:
 def create_backup() -> dict:
     """Erstellt manuell ein Backup des aktuellen Modells"""
     try:
-        if not os.path.isfile(MODEL_PATH):
+        if not model_files_exist():
             return {
                 'success': False,
                 'error': 'Kein Modell vorhanden'
@@ -851,13 +3558,10 @@ def create_backup() -> dict:
         
         backup_model()
         
-        with _model_lock:
-            backup_count = len([f for f in os.listdir(MODEL_BACKUP_DIR) if f.startswith('model_')]) if os.path.isdir(MODEL_BACKUP_DIR) else 0
-        
         return {
             'success': True,
             'message': 'Backup erfolgreich erstellt',
-            'backup_count': backup_count,
+            'backup_count': _model_state.get('backup_count', 0),
             'last_backup_at': _model_state.get('last_backup_at', 0)
         }
     except Exception as err:
@@ -867,40 +3571,160 @@ def create_backup() -> dict:
         }
 
 
+def _metric_labels(**labels) -> str:
+    if not labels:
+        return ''
+    escaped = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels) -> list:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{_metric_labels(**labels, le=repr(float(bound)))} {cumulative}')
+    lines.append(f'{name}_bucket{_metric_labels(**labels, le="+Inf")} {histogram.count}')
+    lines.append(f'{name}_sum{_metric_labels(**labels)} {histogram.sum!r}')
+    lines.append(f'{name}_count{_metric_labels(**labels)} {histogram.count}')
+    return lines
+
+
+def render_metrics() -> str:
+    """Alle Kennzahlen im Prometheus-Textformat (Version 0.0.4), je Worker-Prozess."""
+    snapshot = _model_snapshot
+    with _metrics_lock:
+        in_flight = _metrics['in_flight']
+        requests_total = dict(_metrics['requests'])
+        request_seconds = {key: h.copy() for key, h in _metrics['request_seconds'].items()}
+        inference_seconds = {key: h.copy() for key, h in _metrics['inference_seconds'].items()}
+        phase_seconds = {key: h.copy() for key, h in _metrics['training_phase_seconds'].items()}
+        phase_last = dict(_metrics['training_phase_last'])
+        phase_total = dict(_metrics['training_phase_total'])
+    cache = _prediction_cache.stats()
+    features = _model_state.get('feature_cache')
+    feature_lookups = (features.hits + features.misses) if isinstance(features, FeatureCache) else 0
+
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples: list) -> None:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            lines.append(f'{name}{_metric_labels(**labels)} {value}')
+
+    prefix = 'werkstatt_ki'
+    metric(f'{prefix}_worker_info', 'gauge', 'Worker-Prozess und Rolle (trainer/follower).',
+           [({'pid': os.getpid(), 'role': _worker_state['role']}, 1)])
+    metric(f'{prefix}_http_requests_in_flight', 'gauge', 'Gerade laufende HTTP-Requests.', [({}, in_flight)])
+    metric(f'{prefix}_http_requests_total', 'counter', 'HTTP-Requests je Route, Methode und Status.',
+           [({'handler': h, 'method': m, 'status': st}, n) for (h, m, st), n in sorted(requests_total.items())])
+    lines.append(f'# HELP {prefix}_http_request_duration_seconds Latenz je Route.')
+    lines.append(f'# TYPE {prefix}_http_request_duration_seconds histogram')
+    for (handler, method), histogram in sorted(request_seconds.items()):
+        lines.extend(_histogram_lines(f'{prefix}_http_request_duration_seconds', histogram, handler=handler, method=method))
+    lines.append(f'# HELP {prefix}_inference_step_duration_seconds Dauer der Inferenz-Schritte.')
+    lines.append(f'# TYPE {prefix}_inference_step_duration_seconds histogram')
+    for step, histogram in sorted(inference_seconds.items()):
+        lines.extend(_histogram_lines(f'{prefix}_inference_step_duration_seconds', histogram, step=step))
+    lines.append(f'# HELP {prefix}_training_phase_duration_seconds Dauer je Phase und Training.')
+    lines.append(f'# TYPE {prefix}_training_phase_duration_seconds histogram')
+    for phase, histogram in sorted(phase_seconds.items()):
+        lines.extend(_histogram_lines(f'{prefix}_training_phase_duration_seconds', histogram, phase=phase))
+    metric(f'{prefix}_training_phase_last_seconds', 'gauge', 'Dauer je Phase im letzten bzw. laufenden Training.',
+           [({'phase': phase}, repr(seconds)) for phase, seconds in sorted(phase_last.items())])
+    metric(f'{prefix}_training_phase_seconds_total', 'counter', 'Summierte Dauer je Phase ueber alle Trainings.',
+           [({'phase': phase}, repr(seconds)) for phase, seconds in sorted(phase_total.items())])
+    metric(f'{prefix}_trainings_total', 'counter', 'Abgeschlossene Trainings.', [({}, _model_state.get('total_trainings', 0))])
+    metric(f'{prefix}_training_in_progress', 'gauge', '1 waehrend eines Trainings.',
+           [({}, int(bool(_model_state.get('training_in_progress'))))])
+    metric(f'{prefix}_training_last_duration_seconds', 'gauge', 'Dauer des letzten Trainings.',
+           [({}, repr(float(_model_state.get('last_training_duration', 0) or 0)))])
+    metric(f'{prefix}_prediction_cache_requests_total', 'counter', 'Lookups im Vorhersage-Cache.',
+           [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])])
+    metric(f'{prefix}_prediction_cache_hit_ratio', 'gauge', 'Trefferquote des Vorhersage-Caches.', [({}, cache['hit_rate'])])
+    metric(f'{prefix}_prediction_cache_entries', 'gauge', 'Eintraege im Vorhersage-Cache.', [({}, cache['size'])])
+    metric(f'{prefix}_feature_cache_hit_ratio', 'gauge', 'Trefferquote des N-Gramm-Caches im Training.',
+           [({}, round(features.hits / feature_lookups, 4) if feature_lookups else 0.0)])
+    metric(f'{prefix}_model_samples', 'gauge', 'Trainings-Samples des aktiven Modells.', [({}, snapshot.samples)])
+    metric(f'{prefix}_model_tasks', 'gauge', 'Bekannte Tasks des aktiven Modells.',
+           [({}, len(snapshot.task_texts) if snapshot.task_texts is not None else 0)])
+    metric(f'{prefix}_model_size_bytes', 'gauge', 'Groesse der Modelldateien.', [({}, _model_state.get('model_size_bytes', 0))])
+    metric(f'{prefix}_model_trained_timestamp_seconds', 'gauge', 'Zeitpunkt des letzten Trainings.', [({}, snapshot.trained_at)])
+    metric(f'{prefix}_backups', 'gauge', 'Vorhandene Modell-Backups.', [({}, _model_state.get('backup_count', 0))])
+    http_metrics = get_http_metrics()
+    metric(f'{prefix}_backend_requests_total', 'counter', 'Aufrufe zum Backend je Art.',
+           [({'call': name, 'outcome': 'ok'}, m['calls'] - m['errors']) for name, m in sorted(http_metrics.items())]
+           + [({'call': name, 'outcome': 'error'}, m['errors']) for name, m in sorted(http_metrics.items())])
+    metric(f'{prefix}_backend_request_seconds_total', 'counter', 'Summierte Dauer der Backend-Aufrufe.',
+           [({'call': name}, repr(m['total_seconds'])) for name, m in sorted(http_metrics.items())])
+    return '\n'.join(lines) + '\n'
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.get('/api/stats')
 def get_statistics() -> dict:
     """Liefert detaillierte Statistiken über den KI-Service"""
-    with _model_lock:
-        stats = {
-            'service': {
-                'device': socket.gethostname(),
-                'port': SERVICE_PORT,
-                'backend_url': get_backend_url(),
-                'uptime_seconds': int(time.time() - _model_state.get('trained_at', time.time()))
-            },
-            'model': {
-                'samples': _model_state.get('samples', 0),
-                'trained_at': _model_state.get('trained_at', 0),
-                'last_id': _model_state.get('last_id', 0),
-                'model_exists': os.path.isfile(MODEL_PATH),
-                'model_size_bytes': os.path.getsize(MODEL_PATH) if os.path.isfile(MODEL_PATH) else 0
-            },
-            'training': {
-                'interval_minutes': TRAINING_INTERVAL_MINUTES,
-                'lookback_days': TRAINING_LOOKBACK_DAYS,
-                'in_progress': _model_state.get('training_in_progress', False),
-                'last_request_at': _model_state.get('last_train_request_at', 0),
-                'last_duration_seconds': _model_state.get('last_training_duration', 0),
-                'total_trainings': _model_state.get('total_trainings', 0),
-                'last_error': _model_state.get('last_error')
-            },
-            'backups': {
-                'count': len([f for f in os.listdir(MODEL_BACKUP_DIR) if f.startswith('model_')]) if os.path.isdir(MODEL_BACKUP_DIR) else 0,
-                'last_backup_at': _model_state.get('last_backup_at', 0),
-                'backup_dir': MODEL_BACKUP_DIR
-            },
-            'cache': {
-                'size': len(_model_state.get('training_cache', {}))
+    snapshot = _model_snapshot
+    training_cache = _model_state.get('training_cache')
+    return {
+        'service': {
+            'device': socket.gethostname(),
+            'port': SERVICE_PORT,
+            'backend_url': get_backend_url(),
+            'uptime_seconds': int(time.time() - (snapshot.trained_at or time.time())),
+            'worker': {
+                'pid': os.getpid(),
+                'role': _worker_state['role'],
+                'model_reloads': _worker_state['model_reloads']
             }
+        },
+        'model': {
+            'samples': snapshot.samples,
+            'trained_at': snapshot.trained_at,
+            'last_id': _model_state.get('last_id', 0),
+            'model_exists': _model_state.get('model_exists', False),
+            'model_size_bytes': _model_state.get('model_size_bytes', 0)
+        },
+        'training': {
+            'interval_minutes': TRAINING_INTERVAL_MINUTES,
+            'lookback_days': TRAINING_LOOKBACK_DAYS,
+            'in_progress': _model_state.get('training_in_progress', False),
+            'last_request_at': _model_state.get('last_train_request_at', 0),
+            'last_duration_seconds': _model_state.get('last_training_duration', 0),
+            'total_trainings': _model_state.get('total_trainings', 0),
+            'last_error': _model_state.get('last_error'),
+            'profile': training_profile_stats()
+        },
+        'backups': {
+            'count': _model_state.get('backup_count', 0),
+            'last_backup_at': _model_state.get('last_backup_at', 0),
+            'backup_dir': MODEL_BACKUP_DIR
+        },
+        'cache': {
+            # vor dem ersten Training liegt der Cache nur auf der Platte
+            'size': len(training_cache) if training_cache is not None else _model_state.get('cache_size', 0)
+        },
+        'startup': {
+            **_startup,
+            'imports_ms': dict(LazyImport.timings)
+        },
+        'http_client': get_http_metrics(),
+        'prediction_cache': _prediction_cache.stats(),
+        'keyword_cache': _keyword_cache.stats(),
+        'shards': {
+            'mode': TRAINING_SHARDS or None,
+            **(snapshot.shards.stats() if snapshot.shards else {'count': 0})
         }
-    return stats
+    }
+
+
+# Ende des Modulimports (Webstack, Konfiguration, Schluesselwort-Tabellen)
+_startup['module_loaded_s'] = process_uptime()
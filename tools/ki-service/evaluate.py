@@ -0,0 +1,264 @@
+"""
+Offline-Evaluierung des Zeitschaetzers.
+
+Nimmt einen Trainings-Snapshot (Modellverzeichnis data/model, eine
+training-*.joblib, ein altes model.joblib, werkstatt.db oder ein JSON-Export
+von /api/ai/training-data) und vergleicht mehrere Schaetzer-Konfigurationen per
+zeitlich geordneter Kreuzvalidierung, parallel auf allen Kernen.
+
+Beispiele:
+    python evaluate.py data/model
+    python evaluate.py /var/lib/werkstatt-terminplaner/database/werkstatt.db --folds 5
+    python evaluate.py export.json --candidates kandidaten.json --json
+"""
+import argparse
+import importlib
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import TimeSeriesSplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.main import (  # noqa: E402
+    MAX_MINUTES,
+    MIN_MINUTES,
+    aggregate_samples,
+    build_sgd_regressor,
+    normalize_text
+)
+
+# Standard-Kandidaten; eigene Liste per --candidates (JSON-Liste gleicher Form).
+# Optional 'normalizer': 'modul:funktion', um eine andere Normalisierung zu messen.
+DEFAULT_CANDIDATES = [
+    {'name': 'tfidf-ridge (aktuell)', 'vectorizer': 'tfidf', 'ngram_range': [1, 2], 'regressor': 'ridge', 'alpha': 1.0},
+    {'name': 'tfidf-ridge ungruppiert', 'vectorizer': 'tfidf', 'ngram_range': [1, 2], 'regressor': 'ridge', 'alpha': 1.0, 'aggregate': False},
+    {'name': 'tfidf-ridge median', 'vectorizer': 'tfidf', 'ngram_range': [1, 2], 'regressor': 'ridge', 'alpha': 1.0, 'target': 'median'},
+    {'name': 'tfidf-ridge unigram', 'vectorizer': 'tfidf', 'ngram_range': [1, 1], 'regressor': 'ridge', 'alpha': 1.0},
+    {'name': 'tfidf-ridge alpha=0.3', 'vectorizer': 'tfidf', 'ngram_range': [1, 2], 'regressor': 'ridge', 'alpha': 0.3},
+    {'name': 'tfidf-ridge alpha=3', 'vectorizer': 'tfidf', 'ngram_range': [1, 2], 'regressor': 'ridge', 'alpha': 3.0},
+    {'name': 'tfidf-char-ridge', 'vectorizer': 'tfidf', 'analyzer': 'char_wb', 'ngram_range': [3, 5], 'regressor': 'ridge', 'alpha': 1.0},
+    {'name': 'hashing-sgd (inkrementell)', 'vectorizer': 'hashing', 'ngram_range': [1, 2], 'regressor': 'sgd'}
+]
+
+
+def load_snapshot(path: str) -> list:
+    """Liefert Zeilen (id, datum, text, minutes), zeitlich sortiert."""
+    if path.endswith('.db') or path.endswith('.sqlite'):
+        rows = _load_from_db(path)
+    elif path.endswith('.json'):
+        rows = _load_from_json(path)
+    else:
+        rows = _load_from_model(path)
+    rows.sort(key=lambda row: (row['datum'] or '', row['id']))
+    return rows
+
+
+def _load_from_model(path: str) -> list:
+    if os.path.isdir(path):
+        try:
+            with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as handle:
+                files = json.load(handle).get('files', {})
+        except (OSError, ValueError):
+            files = {}
+        path = os.path.join(path, files.get('training', 'training.joblib'))
+    state = joblib.load(path)
+    cache = state.get('training_cache') if isinstance(state, dict) else None
+    if cache is None:
+        raise SystemExit(f'Kein training_cache in {path}')
+    if isinstance(cache, dict):
+        return [dict(entry) for entry in cache.values()]
+    return [cache.get(tid) for tid in cache.ids()]
+
+
+def _termin_row(termin: dict) -> dict:
+    if termin.get('ki_training_exclude') or termin.get('status') != 'abgeschlossen':
+        return None
+    try:
+        minutes = float(termin.get('tatsaechliche_zeit'))
+    except (TypeError, ValueError):
+        return None
+    if not termin.get('arbeit') or minutes <= 0:
+        return None
+    return {
+        'id': int(termin['id']),
+        'datum': termin.get('datum'),
+        'text': normalize_text(termin['arbeit']),
+        'raw': termin['arbeit'],
+        'minutes': minutes
+    }
+
+
+def _load_from_db(path: str) -> list:
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        termine = conn.execute('''
+            SELECT id, arbeit, tatsaechliche_zeit, status, datum, ki_training_exclude
+            FROM termine
+            WHERE geloescht_am IS NULL AND arbeit IS NOT NULL
+                AND tatsaechliche_zeit IS NOT NULL AND tatsaechliche_zeit > 0
+        ''').fetchall()
+    finally:
+        conn.close()
+    return [row for row in (_termin_row(dict(t)) for t in termine) if row]
+
+
+def _load_from_json(path: str) -> list:
+    with open(path, encoding='utf-8') as handle:
+        payload = json.load(handle)
+    termine = payload.get('data', {}).get('termine', []) if isinstance(payload, dict) else payload
+    return [row for row in (_termin_row(t) for t in termine) if row]
+
+
+def build_vectorizer(candidate: dict):
+    ngram_range = tuple(candidate.get('ngram_range', (1, 2)))
+    analyzer = candidate.get('analyzer', 'word')
+    if candidate.get('vectorizer') == 'hashing':
+        return HashingVectorizer(
+            ngram_range=ngram_range, analyzer=analyzer,
+            n_features=2 ** 18, alternate_sign=False, norm='l2'
+        )
+    return TfidfVectorizer(ngram_range=ngram_range, analyzer=analyzer)
+
+
+def fit_regressor(candidate: dict, X, y, weights=None):
+    if candidate.get('regressor') == 'sgd':
+        if weights is None:
+            weights = np.ones(len(y))
+        return build_sgd_regressor(X, y, weights)
+    regressor = Ridge(alpha=float(candidate.get('alpha', 1.0)))
+    regressor.fit(X, y, sample_weight=weights)
+    return regressor
+
+
+def resolve_normalizer(candidate: dict):
+    """'modul:funktion' aus der Kandidaten-Konfiguration, sonst None (Cache-Text)."""
+    spec = candidate.get('normalizer')
+    if not spec:
+        return None
+    module_name, _, func_name = spec.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def evaluate_fold(candidate: dict, train_rows: list, test_rows: list) -> dict:
+    """Trainiert einen Kandidaten auf einem Fold und misst Fehler und Kosten."""
+    normalizer = resolve_normalizer(candidate)
+    if normalizer:
+        # Rohtext nur bei DB/JSON-Snapshots vorhanden, sonst der bereits normalisierte Text
+        train_rows = [{**row, 'text': normalizer(row.get('raw', row['text']))} for row in train_rows]
+        test_rows = [{**row, 'text': normalizer(row.get('raw', row['text']))} for row in test_rows]
+    texts = [row['text'] for row in train_rows]
+    targets = np.array([row['minutes'] for row in train_rows])
+
+    fit_start = time.perf_counter()
+    vectorizer = build_vectorizer(candidate)
+    if candidate.get('aggregate', True):
+        samples = aggregate_samples(texts, targets)
+        y = samples['medians'] if candidate.get('target') == 'median' else samples['means']
+        X = vectorizer.fit_transform(samples['texts'])
+        regressor = fit_regressor(candidate, X, y, samples['counts'])
+    else:
+        X = vectorizer.fit_transform(texts)
+        regressor = fit_regressor(candidate, X, targets)
+    fit_seconds = time.perf_counter() - fit_start
+
+    test_texts = [row['text'] for row in test_rows]
+    actual = np.array([row['minutes'] for row in test_rows])
+    predict_start = time.perf_counter()
+    for text in test_texts[:200]:
+        regressor.predict(vectorizer.transform([text]))
+    single_seconds = (time.perf_counter() - predict_start) / max(min(len(test_texts), 200), 1)
+    predicted = regressor.predict(vectorizer.transform(test_texts))
+    predicted = np.clip(np.round(predicted), MIN_MINUTES, MAX_MINUTES)
+
+    errors = np.abs(predicted - actual)
+    return {
+        'abs_errors': errors.tolist(),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': single_seconds,
+        'model_bytes': len(pickle.dumps((vectorizer, regressor), protocol=pickle.HIGHEST_PROTOCOL))
+    }
+
+
+def run(rows: list, candidates: list, folds: int, workers: int) -> list:
+    splits = list(TimeSeriesSplit(n_splits=folds).split(rows))
+    jobs = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, candidate in enumerate(candidates):
+            for train_idx, test_idx in splits:
+                future = pool.submit(
+                    evaluate_fold,
+                    candidate,
+                    [rows[i] for i in train_idx],
+                    [rows[i] for i in test_idx]
+                )
+                jobs.append((index, future))
+
+        per_candidate = {index: [] for index in range(len(candidates))}
+        for index, future in jobs:
+            per_candidate[index].append(future.result())
+
+    results = []
+    for index, candidate in enumerate(candidates):
+        folds_result = per_candidate[index]
+        errors = np.concatenate([np.array(f['abs_errors']) for f in folds_result])
+        results.append({
+            'name': candidate.get('name', f'kandidat-{index}'),
+            'mae': float(errors.mean()),
+            'p90': float(np.percentile(errors, 90)),
+            'fit_ms': 1000 * float(np.mean([f['fit_seconds'] for f in folds_result])),
+            'predict_us': 1e6 * float(np.mean([f['predict_seconds'] for f in folds_result])),
+            'model_kb': float(np.mean([f['model_bytes'] for f in folds_result])) / 1024
+        })
+    return results
+
+
+def print_table(results: list, rows: int, folds: int) -> None:
+    print(f'{rows} Samples, {folds} zeitlich geordnete Folds')
+    header = f"{'Kandidat':<30} {'MAE':>8} {'p90':>8} {'Fit ms':>9} {'Predict us':>11} {'Modell KB':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in sorted(results, key=lambda r: r['mae']):
+        print(
+            f"{result['name']:<30} {result['mae']:>8.1f} {result['p90']:>8.1f} "
+            f"{result['fit_ms']:>9.1f} {result['predict_us']:>11.0f} {result['model_kb']:>10.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Offline-Evaluierung des KI-Zeitschaetzers')
+    parser.add_argument('snapshot', help='Modellverzeichnis, training-*.joblib, werkstatt.db oder JSON-Export')
+    parser.add_argument('--candidates', help='JSON-Datei mit Kandidaten-Konfigurationen')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--json', action='store_true', help='Ergebnis als JSON ausgeben')
+    args = parser.parse_args()
+
+    rows = load_snapshot(args.snapshot)
+    if len(rows) < args.folds + 1:
+        raise SystemExit(f'Zu wenig Trainingsdaten ({len(rows)}) fuer {args.folds} Folds')
+
+    candidates = DEFAULT_CANDIDATES
+    if args.candidates:
+        with open(args.candidates, encoding='utf-8') as handle:
+            candidates = json.load(handle)
+
+    results = run(rows, candidates, args.folds, args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results, len(rows), args.folds)
+
+
+if __name__ == '__main__':
+    main()